@@ -5,6 +5,24 @@ from sympy import symbols, solve, sympify, simplify, Eq
 from sympy.parsing.sympy_parser import parse_expr
 import traceback
 
+# Keyword groups used by MathAI.classify_problem, built once at import
+MULTI_STEP_KEYWORDS = ('then', 'after that', 'first', 'next', 'finally')
+PERCENTAGE_KEYWORDS = ('%', 'percent', 'percentage', 'discount', 'tax', 'tip')
+COMPARISON_KEYWORDS = ('twice', 'double', 'triple', 'half', 'times as much', 'more than', 'less than')
+RATE_INDICATORS = ('per', 'an hour', 'per hour', 'each', 'at')
+WORK_CONTEXT = ('work', 'worked', 'earn', 'make', 'buy', 'cost', 'speed', 'dollar', '$')
+AVERAGE_KEYWORDS = ('average', 'mean', 'median')
+
+# Precompiled patterns for parsing and solving
+NUMBER_RE = re.compile(r'\d+\.?\d*')
+IMPLICIT_MULT_RE = re.compile(r'(\d)([xy])')
+STEP_SPLIT_RE = re.compile(r'then|after that|next|,')
+
+# Word rewriting for the arithmetic fallback, applied in a single pass each
+OPERATOR_WORDS = {'plus': '+', 'minus': '-', 'times': '*', 'divided by': '/'}
+FILLER_WORDS_RE = re.compile(r'what|is|calculate|compute|\?|the')
+OPERATOR_WORDS_RE = re.compile('|'.join(map(re.escape, OPERATOR_WORDS)))
+
 # ============================================================================
 # ROBUST AI WORD-PROBLEM REASONING ENGINE
 # ============================================================================
@@ -116,8 +134,7 @@ class MathAI:
         }
         
         # Extract numbers (including decimals and percentages)
-        number_pattern = r'\d+\.?\d*'
-        numbers = re.findall(number_pattern, query)
+        numbers = NUMBER_RE.findall(query)
         parsed['numbers'] = [float(n) for n in numbers]
         
         # Check for variables
@@ -145,11 +162,11 @@ class MathAI:
         confidence = 1.0
         
         # Sequential/multi-step (highest priority)
-        if any(word in query for word in ['then', 'after that', 'first', 'next', 'finally']):
+        if any(word in query for word in MULTI_STEP_KEYWORDS):
             return "multi_step", 0.95
         
         # Percentage problems
-        if any(word in query for word in ['%', 'percent', 'percentage', 'discount', 'tax', 'tip']):
+        if any(word in query for word in PERCENTAGE_KEYWORDS):
             return "percentage", 0.95
         
         # Equation problems (has variable and equals)
@@ -157,19 +174,15 @@ class MathAI:
             return "equation", 0.95
         
         # Comparison problems
-        comparison_keywords = ['twice', 'double', 'triple', 'half', 'times as much', 'more than', 'less than']
-        if any(word in query for word in comparison_keywords):
+        if any(word in query for word in COMPARISON_KEYWORDS):
             return "comparison", 0.90
         
         # Rate problems (wage, speed, cost per item)
-        rate_indicators = ['per', 'an hour', 'per hour', 'each', 'at']
-        work_context = ['work', 'worked', 'earn', 'make', 'buy', 'cost', 'speed', 'dollar', '$']
-        
-        if any(ind in query for ind in rate_indicators) and any(ctx in query for ctx in work_context):
+        if any(ind in query for ind in RATE_INDICATORS) and any(ctx in query for ctx in WORK_CONTEXT):
             return "rate", 0.92
         
         # Average/statistics
-        if any(word in query for word in ['average', 'mean', 'median']):
+        if any(word in query for word in AVERAGE_KEYWORDS):
             return "average", 0.95
         
         # Default to arithmetic
@@ -356,8 +369,8 @@ class MathAI:
             left, right = equation_str.split('=')
             
             # Add implicit multiplication (2x → 2*x)
-            left = re.sub(r'(\d)([xy])', r'\1*\2', left.strip())
-            right = re.sub(r'(\d)([xy])', r'\1*\2', right.strip())
+            left = IMPLICIT_MULT_RE.sub(r'\1*\2', left.strip())
+            right = IMPLICIT_MULT_RE.sub(r'\1*\2', right.strip())
             
             # Parse with SymPy
             x, y = symbols('x y')
@@ -404,12 +417,12 @@ class MathAI:
         explanation += f"STEP 1: Starting value = {result}\n\n"
         
         # Split by step indicators
-        steps = re.split(r'then|after that|next|,', query)
+        steps = STEP_SPLIT_RE.split(query)
         step_num = 2
         
         for step in steps[1:]:
             step = step.strip()
-            nums_in_step = re.findall(r'\d+\.?\d*', step)
+            nums_in_step = NUMBER_RE.findall(step)
             
             if not nums_in_step:
                 continue
@@ -499,14 +512,10 @@ class MathAI:
             return "Error", "Need at least 2 numbers for arithmetic"
         
         # Clean for SymPy
-        cleaned = query
-        for word in ['what', 'is', 'calculate', 'compute', '?', 'the']:
-            cleaned = cleaned.replace(word, '')
-        cleaned = cleaned.strip()
+        cleaned = FILLER_WORDS_RE.sub('', query).strip()
         
         # Replace words with operators
-        cleaned = cleaned.replace('plus', '+').replace('minus', '-')
-        cleaned = cleaned.replace('times', '*').replace('divided by', '/')
+        cleaned = OPERATOR_WORDS_RE.sub(lambda m: OPERATOR_WORDS[m.group(0)], cleaned)
         
         try:
             expr = parse_expr(cleaned, transformations='all')
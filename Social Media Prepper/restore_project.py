@@ -99,7 +99,7 @@ def create_requirements_txt():
     root = get_project_root()
     req_file = root / "requirements.txt"
     
-    required_packages = """streamlit>=1.28.0
+    required_packages = """streamlit>=1.37.0
 pyyaml>=6.0
 pillow>=10.0.0
 python-dateutil>=2.8.0"""
@@ -6,6 +6,11 @@ Browser-based version of Social Studio
 import yaml
 import streamlit as st
 import logging
+import hashlib
+import os
+import re
+import shutil
+import time
 from pathlib import Path
 import tempfile
 import base64
@@ -26,6 +31,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# A '#' at the start of a whitespace-separated word
+HASHTAG_START_RE = re.compile(r'(?:^|\s)#')
+
+# Uploaded files left behind by abandoned sessions are removed after this long
+UPLOAD_MAX_AGE = 24 * 60 * 60  # seconds
+
 
 # Initialize session state
 if 'step' not in st.session_state:
@@ -46,16 +57,115 @@ if 'hashtags' not in st.session_state:
     st.session_state.hashtags = {}
 if 'hashtags_generated' not in st.session_state:
     st.session_state.hashtags_generated = False  # Track if hashtags have been auto-generated
+if 'upload_dirs' not in st.session_state:
+    st.session_state.upload_dirs = set()  # Content-hash upload dirs written by this session
+
+
+@st.cache_resource(max_entries=1)
+def load_components(config_file: str, config_mtime_ns: int):
+    """
+    Build the shared components once per server process and config version
+    
+    config_mtime_ns is only part of the cache key, so an edited config.yaml
+    is picked up by the next new session instead of after a server restart.
+    """
+    config = ConfigManager(config_file)
+    return (
+        config,
+        ContentProcessor(config),
+        ExportManager(config)
+    )
+
+
+@st.cache_resource
+def get_temp_dir() -> Path:
+    """Create the shared temp directory once per server process"""
+    temp_dir = Path(tempfile.gettempdir()) / "social_studio"
+    temp_dir.mkdir(exist_ok=True)
+    return temp_dir
+
+
+def hash_bytes(data: bytes) -> str:
+    """Short content hash used to key uploaded files"""
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def materialize_upload(temp_dir: Path, name: str, data: bytes, digest: str) -> Path:
+    """Write uploaded bytes to a temp file once, reusing it while the content is unchanged"""
+    # Files live under their content hash so same-named uploads never collide
+    temp_input = temp_dir / digest / name
+    st.session_state.upload_dirs.add(digest)
+    if not temp_input.exists():
+        temp_input.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file beside it and swap it in, so an interrupted
+        # write never leaves a truncated file under the content-hash name
+        fd, temp_path = tempfile.mkstemp(dir=temp_input.parent, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, temp_input)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+    return temp_input
+
+
+def release_uploads(temp_dir: Path, keep=frozenset()):
+    """
+    Remove this session's uploaded files except those still in use, plus any
+    upload left by another session that hasn't been touched in UPLOAD_MAX_AGE
+    
+    A removed file is simply written again by materialize_upload if needed.
+    """
+    for digest in st.session_state.upload_dirs - set(keep):
+        shutil.rmtree(temp_dir / digest, ignore_errors=True)
+    st.session_state.upload_dirs &= set(keep)
+    
+    cutoff = time.time() - UPLOAD_MAX_AGE
+    for entry in os.scandir(temp_dir):
+        try:
+            if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def clip_audio_cached(file_hash: str, file_name: str, start_time: float, duration: float,
+                      _processor, _input_path: Path, _output_dir: Path):
+    """
+    Clip audio once per (content, file name, start, duration)
+    
+    The cache is shared by all sessions and the clip's filename is derived
+    from the upload's name, so the name is part of the key alongside the hash.
+    
+    Returns:
+        Tuple of (clip filename, clip bytes)
+    """
+    result_path = _processor.clip_audio(_input_path, _output_dir, start_time, duration)
+    if not result_path or not Path(result_path).exists():
+        # Raise rather than return so failures are not cached
+        raise RuntimeError(f"Audio clipping failed for {_input_path.name}")
+    
+    with open(result_path, 'rb') as f:
+        return Path(result_path).name, f.read()
 
 
 def init_components():
     """Initialize components"""
     if 'config' not in st.session_state:
         config_file = Path(__file__).parent / 'config' / 'config.yaml'
-        st.session_state.config = ConfigManager(str(config_file))
-        st.session_state.processor = ContentProcessor(st.session_state.config)
+        try:
+            config_mtime_ns = config_file.stat().st_mtime_ns
+        except OSError:
+            config_mtime_ns = 0  # Missing config; ConfigManager reports it
+        (
+            st.session_state.config,
+            st.session_state.processor,
+            st.session_state.export_mgr
+        ) = load_components(str(config_file), config_mtime_ns)
+        # Per session: the caption generator keeps per-user hashtag rotation and AI caption state
         st.session_state.caption_gen = CaptionGenerator(st.session_state.config)
-        st.session_state.export_mgr = ExportManager(st.session_state.config)
 
 
 def show_header():
@@ -195,40 +305,40 @@ def step_generate():
                     duration = 0
                     start_time = 0
                 
-                # Save uploaded file temporarily
-                temp_dir = Path(tempfile.gettempdir()) / "social_studio"
-                temp_dir.mkdir(exist_ok=True)
-                temp_input = temp_dir / file.name
-                
-                with open(temp_input, 'wb') as f:
-                    f.write(file.getvalue())
+                # Read and hash the upload once; later steps reuse both from the clip
+                data = file.getvalue()
+                file_hash = hash_bytes(data)
                 
                 # Process the clip based on media type
                 output_name = f"processed_{file.name}"
+                applied = None  # Settings the processed clip was actually made with
                 
                 try:
                     if st.session_state.media_type == 'audio':
-                        # Clip audio - returns path to output file
-                        result_path = st.session_state.processor.clip_audio(
-                            Path(temp_input),
-                            Path(temp_dir),
+                        # Save uploaded file temporarily
+                        temp_dir = get_temp_dir()
+                        temp_input = materialize_upload(temp_dir, file.name, data, file_hash)
+                        
+                        # Clip audio - reuses the cached clip for identical settings
+                        output_name, clip_bytes = clip_audio_cached(
+                            file_hash,
+                            file.name,
                             start_time,
-                            duration
+                            duration,
+                            st.session_state.processor,
+                            temp_input,
+                            temp_dir
                         )
-                        if result_path and Path(result_path).exists():
-                            with open(result_path, 'rb') as f:
-                                st.session_state.processed_clips[file.name] = f.read()
-                            output_name = Path(result_path).name
-                        else:
-                            st.session_state.processed_clips[file.name] = file.getvalue()
+                        st.session_state.processed_clips[file.name] = clip_bytes
+                        applied = (start_time, duration)
                             
                     elif st.session_state.media_type == 'image':
                         # Copy image (processing happens in edit step if needed)
-                        st.session_state.processed_clips[file.name] = file.getvalue()
+                        st.session_state.processed_clips[file.name] = data
                         
                 except Exception as e:
                     logger.warning(f"Processing failed for {file.name}, using original: {e}")
-                    st.session_state.processed_clips[file.name] = file.getvalue()
+                    st.session_state.processed_clips[file.name] = data
                 
                 clips.append({
                     'file': file,
@@ -236,10 +346,15 @@ def step_generate():
                     'start_time': start_time,
                     'crop_preset': '9:16',
                     'platforms': st.session_state.selected_platforms,
-                    'processed_name': output_name
+                    'processed_name': output_name,
+                    'applied': applied,
+                    'bytes': data,
+                    'hash': file_hash
                 })
             
             st.session_state.generated_clips = clips
+            # Drop uploads from earlier batches that these clips no longer use
+            release_uploads(get_temp_dir(), keep={clip['hash'] for clip in clips})
             st.success(f"Γ£ô Generated and processed {len(clips)} clips!")
     
     if st.session_state.generated_clips:
@@ -314,38 +429,43 @@ def step_edit():
             
             if st.session_state.media_type == 'audio':
                 if st.button("Γ£ô Apply Changes & Reprocess", type="primary"):
-                    # Update clip data
-                    clip['start_time'] = start_time
-                    clip['duration'] = duration
-                    
-                    # Reprocess audio clip with new settings
-                    with st.spinner("Reprocessing audio clip..."):
-                        temp_dir = Path(tempfile.gettempdir()) / "social_studio"
-                        temp_dir.mkdir(exist_ok=True)
-                        temp_input = temp_dir / clip['file'].name
-                        
-                        # Save uploaded file
-                        with open(temp_input, 'wb') as f:
-                            f.write(clip['file'].getvalue())
-                        
-                        try:
-                            result_path = st.session_state.processor.clip_audio(
-                                Path(temp_input),
-                                Path(temp_dir),
-                                start_time,
-                                duration
+                    # Nothing to do if the processed clip was already made with these settings
+                    if (start_time, duration) == clip.get('applied'):
+                        st.info("No changes to apply")
+                    else:
+                        # Reprocess audio clip with new settings
+                        with st.spinner("Reprocessing audio clip..."):
+                            temp_dir = get_temp_dir()
+                            
+                            # Reuse the uploaded file already written for this content
+                            temp_input = materialize_upload(
+                                temp_dir, clip['file'].name, clip['bytes'], clip['hash']
                             )
-                            if result_path and Path(result_path).exists():
-                                with open(result_path, 'rb') as f:
-                                    st.session_state.processed_clips[clip['file'].name] = f.read()
-                                clip['processed_name'] = Path(result_path).name
                             
-                            # Regenerate hashtags when clip is edited
-                            st.session_state.hashtags_generated = False
-                            st.success("Γ£à Changes applied! Audio reprocessed and hashtags will regenerate.")
+                            try:
+                                processed_name, clip_bytes = clip_audio_cached(
+                                    clip['hash'],
+                                    clip['file'].name,
+                                    start_time,
+                                    duration,
+                                    st.session_state.processor,
+                                    temp_input,
+                                    temp_dir
+                                )
+                                st.session_state.processed_clips[clip['file'].name] = clip_bytes
+                                clip['processed_name'] = processed_name
+                                
+                                # Update clip data only once the clip has been reprocessed
+                                clip['start_time'] = start_time
+                                clip['duration'] = duration
+                                clip['applied'] = (start_time, duration)
+                                
+                                # Regenerate hashtags when clip is edited
+                                st.session_state.hashtags_generated = False
+                                st.success("Γ£à Changes applied! Audio reprocessed and hashtags will regenerate.")
                             
-                        except Exception as e:
-                            st.error(f"Γ¥î Error reprocessing clip: {e}")
+                            except Exception as e:
+                                st.error(f"Γ¥î Error reprocessing clip: {e}")
     
     st.divider()
     
@@ -360,6 +480,49 @@ def step_edit():
             st.rerun()
 
 
+@st.fragment
+def render_platform_tab(platform: str):
+    """Caption and hashtag editors for one platform (reruns on its own)"""
+    st.subheader(f"≡ƒô▒ {platform.title()}")
+    
+    # Editable caption
+    caption_value = st.text_area(
+        "Caption:",
+        value=st.session_state.captions.get(platform, ""),
+        key=f"caption_{platform}",
+        height=100
+    )
+    st.session_state.captions[platform] = caption_value
+    
+    # Editable hashtags (auto-generated but editable)
+    current_hashtags = st.session_state.hashtags.get(platform, "")
+    hashtag_value = st.text_area(
+        "Hashtags (auto-generated, editable):",
+        value=current_hashtags,
+        key=f"hashtags_{platform}",
+        height=80,
+        help="Edit or add hashtags. Each hashtag should start with #"
+    )
+    st.session_state.hashtags[platform] = hashtag_value
+    
+    # Show count
+    if hashtag_value:
+        hashtag_count = len(HASHTAG_START_RE.findall(hashtag_value))
+        st.caption(f"≡ƒÅ╖∩╕Å {hashtag_count} hashtags")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("≡ƒöä Regenerate Hashtags", key=f"regen_{platform}"):
+            hashtags = st.session_state.caption_gen.generate_hashtags(
+                st.session_state.media_type, platform
+            )
+            st.session_state.hashtags[platform] = st.session_state.caption_gen.format_hashtags(hashtags[:10])
+            st.rerun(scope="fragment")
+    with col2:
+        if st.button("Γ£ô Approve", key=f"approve_{platform}", type="primary"):
+            st.success("Approved!")
+
+
 def step_preview():
     """Step 4: Platform previews"""
     st.header("≡ƒô▒ Step 4: Platform Previews")
@@ -395,65 +558,33 @@ def step_preview():
     # Auto-generate hashtags for all platforms if not done yet
     if not st.session_state.hashtags_generated:
         with st.spinner("≡ƒÅ╖∩╕Å Generating hashtags..."):
+            caption_gen = st.session_state.caption_gen
+            media_type = st.session_state.media_type
+            existing_captions = st.session_state.captions
+            new_captions = {}
+            new_hashtags = {}
+            
             for platform in st.session_state.selected_platforms:
-                if platform not in st.session_state.captions:
-                    caption = st.session_state.caption_gen.generate_caption(
-                        st.session_state.media_type,
+                if platform not in existing_captions:
+                    new_captions[platform] = caption_gen.generate_caption(
+                        media_type,
                         platform,
                         use_ai=False
                     )
-                    st.session_state.captions[platform] = caption
                 
                 # Always generate hashtags
-                hashtags = st.session_state.caption_gen.generate_hashtags(
-                    st.session_state.media_type,
-                    platform
-                )
-                st.session_state.hashtags[platform] = " ".join([f"#{tag}" for tag in hashtags[:10]])
+                hashtags = caption_gen.generate_hashtags(media_type, platform)
+                new_hashtags[platform] = caption_gen.format_hashtags(hashtags[:10])
+            
+            st.session_state.captions.update(new_captions)
+            st.session_state.hashtags.update(new_hashtags)
         
         st.session_state.hashtags_generated = True
         st.success("Γ£à Hashtags generated for all platforms!")
     
     for tab, platform in zip(tabs, st.session_state.selected_platforms):
         with tab:
-            st.subheader(f"≡ƒô▒ {platform.title()}")
-            
-            # Editable caption
-            caption_value = st.text_area(
-                "Caption:",
-                value=st.session_state.captions.get(platform, ""),
-                key=f"caption_{platform}",
-                height=100
-            )
-            st.session_state.captions[platform] = caption_value
-            
-            # Editable hashtags (auto-generated but editable)
-            current_hashtags = st.session_state.hashtags.get(platform, "")
-            hashtag_value = st.text_area(
-                "Hashtags (auto-generated, editable):",
-                value=current_hashtags,
-                key=f"hashtags_{platform}",
-                height=80,
-                help="Edit or add hashtags. Each hashtag should start with #"
-            )
-            st.session_state.hashtags[platform] = hashtag_value
-            
-            # Show count
-            if hashtag_value:
-                hashtag_count = len([h for h in hashtag_value.split() if h.startswith('#')])
-                st.caption(f"≡ƒÅ╖∩╕Å {hashtag_count} hashtags")
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("≡ƒöä Regenerate Hashtags", key=f"regen_{platform}"):
-                    hashtags = st.session_state.caption_gen.generate_hashtags(
-                        st.session_state.media_type, platform
-                    )
-                    st.session_state.hashtags[platform] = " ".join([f"#{tag}" for tag in hashtags[:10]])
-                    st.rerun()
-            with col2:
-                if st.button("Γ£ô Approve", key=f"approve_{platform}", type="primary"):
-                    st.success("Approved!")
+            render_platform_tab(platform)
     
     st.divider()
     
@@ -507,7 +638,7 @@ def step_export():
                 with col2:
                     # Get processed clip bytes
                     original_name = clip['file'].name
-                    file_bytes = st.session_state.processed_clips.get(original_name, clip['file'].getvalue())
+                    file_bytes = st.session_state.processed_clips.get(original_name, clip['bytes'])
                     
                     # Determine mime type
                     if st.session_state.media_type == 'audio':
@@ -533,36 +664,45 @@ def step_export():
     
     if st.button("≡ƒÜÇ Generate Scheduler Export", type="primary"):
         with st.spinner("Creating scheduler files..."):
+            # Resolve per-platform text once instead of per clip
+            platform_ctx = []
+            for platform in st.session_state.selected_platforms:
+                caption = st.session_state.captions.get(platform, '')
+                hashtags = st.session_state.hashtags.get(platform, '')
+                
+                # Combine caption and hashtags for full_text
+                full_text = f"{caption}\n\n{hashtags}" if hashtags else caption
+                platform_ctx.append((platform, caption, hashtags, full_text))
+            
+            media_type = st.session_state.media_type
+            suggested_date = datetime.now().strftime('%Y-%m-%d')
+            
             # Prepare posts data with all required fields
-            posts = []
-            for clip in st.session_state.generated_clips:
-                for platform in st.session_state.selected_platforms:
-                    caption = st.session_state.captions.get(platform, '')
-                    hashtags = st.session_state.hashtags.get(platform, '')
-                    
-                    # Get processed filename
-                    processed_name = clip.get('processed_name', clip['file'].name)
-                    
-                    # Combine caption and hashtags for full_text
-                    full_text = f"{caption}\n\n{hashtags}" if hashtags else caption
-                    
-                    post_data = {
-                        'platform': platform,
-                        'caption': caption,
-                        'hashtags': hashtags,
-                        'hashtags_formatted': hashtags,
-                        'full_text': full_text,
-                        'media_file': processed_name,
-                        'file_path': processed_name,
-                        'media_file_path': processed_name,
-                        'content_type': st.session_state.media_type,
-                        'original_filename': clip['file'].name,
-                        'duration': clip.get('duration', 10),
-                        'media_type': st.session_state.media_type,
-                        'suggested_date': datetime.now().strftime('%Y-%m-%d'),
-                        'suggested_time': '09:00'  # Default time
-                    }
-                    posts.append(post_data)
+            posts = [
+                {
+                    'platform': platform,
+                    'caption': caption,
+                    'hashtags': hashtags,
+                    'hashtags_formatted': hashtags,
+                    'full_text': full_text,
+                    'media_file': processed_name,
+                    'file_path': processed_name,
+                    'media_file_path': processed_name,
+                    'content_type': media_type,
+                    'original_filename': original_name,
+                    'duration': duration,
+                    'media_type': media_type,
+                    'suggested_date': suggested_date,
+                    'suggested_time': '09:00'  # Default time
+                }
+                for original_name, processed_name, duration in (
+                    (clip['file'].name,
+                     clip.get('processed_name', clip['file'].name),
+                     clip.get('duration', 10))
+                    for clip in st.session_state.generated_clips
+                )
+                for platform, caption, hashtags, full_text in platform_ctx
+            ]
             
             # Export to CSV
             scheduler_map = {
@@ -574,7 +714,9 @@ def step_export():
             }
             
             scheduler_key = scheduler_map[scheduler_type]
-            export_files = st.session_state.export_mgr.export_posts(posts, scheduler_key)
+            export_files = st.session_state.export_mgr.export_posts(
+                posts, scheduler_key, in_memory=True
+            )
             
             st.success("Γ£à Export Complete!")
             st.write(f"**Total Posts:** {len(posts)}")
@@ -583,16 +725,14 @@ def step_export():
             # Provide download links for CSV/JSON files
             if export_files:
                 st.markdown("**≡ƒôä Download Export Files:**")
-                for file_type, file_path in export_files.items():
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            st.download_button(
-                                label=f"Γ¼ç∩╕Å Download {file_type.upper()}",
-                                data=f.read(),
-                                file_name=Path(file_path).name,
-                                mime='text/csv' if file_type == 'csv' else 'application/json',
-                                key=f"export_{file_type}"
-                            )
+                for file_type, (file_name, file_bytes) in export_files.items():
+                    st.download_button(
+                        label=f"Γ¼ç∩╕Å Download {file_type.upper()}",
+                        data=file_bytes,
+                        file_name=file_name,
+                        mime='text/csv' if file_type == 'csv' else 'application/json',
+                        key=f"export_{file_type}"
+                    )
             
             st.info(f"≡ƒÆí **Next Steps:**\n1. Γ¼ç∩╕Å Download your audio clips/photos above (if not done yet)\n2. Γ¼ç∩╕Å Download the {scheduler_type} CSV file\n3. ≡ƒôñ Import CSV into {scheduler_type}\n4. ≡ƒôñ Upload your audio clips/photos to {scheduler_type}\n5. ≡ƒôà Schedule your posts!")
     
@@ -605,7 +745,8 @@ def step_export():
             st.rerun()
     with col2:
         if st.button("≡ƒöä Start New Project", type="primary"):
-            # Reset session state
+            # Remove this project's uploaded files, then reset session state
+            release_uploads(get_temp_dir())
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
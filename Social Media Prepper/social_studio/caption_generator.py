@@ -5,6 +5,7 @@ Includes OpenAI integration with fallback to template-based generation
 """
 
 import os
+import re
 import random
 import logging
 from typing import List, Dict, Optional, Tuple
@@ -12,6 +13,35 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of AI captions remembered per generator
+AI_CAPTION_CACHE_SIZE = 512
+
+# Emotion/vibe words for the {emotion} template placeholder
+CAPTION_EMOTIONS = ('fresh', 'fire', 'vibing', 'amazing', 'stunning', 'incredible',
+                    'epic', 'powerful', 'smooth', 'energetic', 'creative', 'inspiring')
+
+# Placeholders supported in caption templates
+CAPTION_PLACEHOLDER_RE = re.compile(r'\{(brand|artist|content_type|emotion)\}')
+
+# Static prompt content for AI captions. Kept ahead of any per-clip details so
+# repeated requests share a stable prefix.
+CAPTION_SYSTEM_PROMPT = """You are a social media content creator specializing in engaging captions.
+
+Write one caption following these requirements:
+- Engaging and authentic
+- Include 2-3 relevant emojis
+- Brand-appropriate tone
+- Do NOT include hashtags (they will be added separately)
+- Keep it concise and impactful
+"""
+
+PLATFORM_PROMPT_INFO = {
+    'instagram': 'Instagram (casual, engaging, use emojis)',
+    'tiktok': 'TikTok (trendy, energetic, youth-focused)',
+    'facebook': 'Facebook (informative, community-focused)',
+    'twitter': 'Twitter (concise, witty, under 280 characters)'
+}
+
 
 class CaptionGenerator:
     """Generates captions and hashtags for social media content"""
@@ -26,10 +56,30 @@ class CaptionGenerator:
         self.config = config_manager
         self.hashtag_rotation_counter = {}  # Track which hashtag set to use next
         self._openai_client = None
-        
-        # Try to initialize OpenAI if enabled
-        if self.config.is_openai_enabled():
-            self._init_openai()
+        self._openai_initialized = False
+        self._ai_caption_cache = {}  # (content_type, platform, filename) -> caption
+        
+        # Resolve caption templates once instead of on every caption
+        self._caption_templates = {
+            content_type: tuple(templates)
+            for content_type, templates in (self.config.get('caption_templates') or {}).items()
+            if templates
+        }
+        # Caption length limits are looked up for every caption, so resolve them once too
+        self._max_caption_lengths = {
+            platform: (platform_config or {}).get('max_caption_length', 2200)
+            for platform, platform_config in (self.config.get('platforms') or {}).items()
+        }
+        self._hashtag_pools = {}  # content_type -> (set names, sets, all hashtags)
+    
+    def _get_openai_client(self):
+        """Get the OpenAI client, importing and creating it on first use"""
+        if not self._openai_initialized:
+            if self.config.is_openai_enabled():
+                self._init_openai()
+            # Mark done only once the client (if any) exists, so no caller sees a half-built state
+            self._openai_initialized = True
+        return self._openai_client
     
     def _init_openai(self):
         """Initialize OpenAI client if available"""
@@ -63,14 +113,27 @@ class CaptionGenerator:
             Generated caption
         """
         # Try AI generation if enabled and requested
-        if use_ai and self._openai_client:
+        if use_ai and self._get_openai_client():
+            cache_key = (content_type, platform, filename)
+            cached_caption = self._ai_caption_cache.get(cache_key)
+            if cached_caption is not None:
+                return cached_caption
+            
             ai_caption = self._generate_ai_caption(content_type, platform, filename)
             if ai_caption:
-                return self._trim_caption_for_platform(ai_caption, platform)
+                caption = self._trim_caption_for_platform(ai_caption, platform)
+                self._cache_ai_caption(cache_key, caption)
+                return caption
         
         # Fall back to template-based generation
         return self._generate_template_caption(content_type, platform, filename)
     
+    def _cache_ai_caption(self, cache_key: Tuple[str, str, str], caption: str):
+        """Remember an AI caption, evicting the oldest entry when full"""
+        if len(self._ai_caption_cache) >= AI_CAPTION_CACHE_SIZE:
+            self._ai_caption_cache.pop(next(iter(self._ai_caption_cache)))
+        self._ai_caption_cache[cache_key] = caption
+    
     def _generate_ai_caption(self, content_type: str, platform: str, 
                             filename: str = "") -> Optional[str]:
         """Generate caption using OpenAI"""
@@ -79,15 +142,16 @@ class CaptionGenerator:
             brand_name = self.config.get_brand_name()
             artist_name = self.config.get_artist_name()
             
-            # Create prompt
-            prompt = self._create_ai_prompt(content_type, platform, brand_name, 
-                                           artist_name, filename)
+            # Static instructions lead so the provider's prompt cache can reuse
+            # the prefix; only per-clip details go in the user message
+            system_prompt = self._create_system_prompt(platform, brand_name, artist_name)
+            prompt = self._create_ai_prompt(content_type, filename)
             
             # Call OpenAI API
             response = self._openai_client.chat.completions.create(
                 model=openai_config.get('model', 'gpt-3.5-turbo'),
                 messages=[
-                    {"role": "system", "content": "You are a social media content creator specializing in engaging captions."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=openai_config.get('temperature', 0.7),
@@ -102,42 +166,31 @@ class CaptionGenerator:
             logger.warning(f"AI caption generation failed: {e}")
             return None
     
-    def _create_ai_prompt(self, content_type: str, platform: str, 
-                         brand_name: str, artist_name: str, filename: str) -> str:
-        """Create prompt for AI caption generation"""
-        platform_info = {
-            'instagram': 'Instagram (casual, engaging, use emojis)',
-            'tiktok': 'TikTok (trendy, energetic, youth-focused)',
-            'facebook': 'Facebook (informative, community-focused)',
-            'twitter': 'Twitter (concise, witty, under 280 characters)'
-        }
+    def _create_system_prompt(self, platform: str, brand_name: str,
+                              artist_name: str) -> str:
+        """Create the static system prompt for AI caption generation"""
+        platform_desc = PLATFORM_PROMPT_INFO.get(platform, platform)
         
-        platform_desc = platform_info.get(platform, platform)
-        
-        prompt = f"""Create an engaging social media caption for {platform_desc}.
-
-Brand: {brand_name}
-Artist: {artist_name}
-Content Type: {content_type}
-Filename: {filename}
-
-Requirements:
-- Engaging and authentic
-- Include 2-3 relevant emojis
-- Brand-appropriate tone
-- Do NOT include hashtags (they will be added separately)
-- Keep it concise and impactful
-"""
+        prompt = CAPTION_SYSTEM_PROMPT
         
         if platform == 'twitter':
-            prompt += "\n- Must be under 200 characters (hashtags added separately)"
+            prompt += "- Must be under 200 characters (hashtags added separately)\n"
+        
+        prompt += f"""
+Platform: {platform_desc}
+Brand: {brand_name}
+Artist: {artist_name}"""
         
         return prompt
     
+    def _create_ai_prompt(self, content_type: str, filename: str) -> str:
+        """Create the per-clip user prompt for AI caption generation"""
+        return f"Content Type: {content_type}\nFilename: {filename}"
+    
     def _generate_template_caption(self, content_type: str, platform: str, 
                                    filename: str = "") -> str:
         """Generate caption using templates from config"""
-        templates = self.config.get_caption_templates(content_type)
+        templates = self._caption_templates.get(content_type)
         
         if not templates:
             # Default template if none configured
@@ -151,22 +204,22 @@ Requirements:
         brand_name = self.config.get_brand_name()
         artist_name = self.config.get_artist_name()
         
-        # Generate emotion/vibe words
-        emotions = ['fresh', 'fire', 'vibing', 'amazing', 'stunning', 'incredible', 
-                   'epic', 'powerful', 'smooth', 'energetic', 'creative', 'inspiring']
-        emotion = random.choice(emotions)
+        # Pick an emotion/vibe word
+        emotion = random.choice(CAPTION_EMOTIONS)
         
-        caption = template.replace('{brand}', brand_name)
-        caption = caption.replace('{artist}', artist_name)
-        caption = caption.replace('{content_type}', content_type)
-        caption = caption.replace('{emotion}', emotion)
+        placeholders = {
+            'brand': brand_name,
+            'artist': artist_name,
+            'content_type': content_type,
+            'emotion': emotion
+        }
+        caption = CAPTION_PLACEHOLDER_RE.sub(lambda m: placeholders[m.group(1)], template)
         
         return self._trim_caption_for_platform(caption, platform)
     
     def _trim_caption_for_platform(self, caption: str, platform: str) -> str:
         """Trim caption to platform's character limit"""
-        platform_config = self.config.get_platform_config(platform)
-        max_length = platform_config.get('max_caption_length', 2200)
+        max_length = self._max_caption_lengths.get(platform, 2200)
         
         if len(caption) > max_length:
             # Trim and add ellipsis
@@ -198,40 +251,43 @@ Requirements:
             count = min(count, max_hashtags)
         
         # Get hashtag sets for this content type
-        hashtag_sets = self.config.get_hashtag_sets(content_type)
+        set_keys, hashtag_sets, all_hashtags = self._get_hashtag_pools(content_type)
         
-        if not hashtag_sets:
+        if not set_keys:
             logger.warning(f"No hashtag sets configured for {content_type}")
             return []
         
         # Get next set to use (rotation to avoid repetition)
         rotation_key = f"{content_type}_{platform}"
         current_index = self.hashtag_rotation_counter.get(rotation_key, 0)
-        set_keys = sorted(hashtag_sets.keys())
-        
-        if not set_keys:
-            return []
-        
-        # Get the hashtag set
         set_key = set_keys[current_index % len(set_keys)]
-        hashtags = hashtag_sets[set_key].copy()
         
         # Update rotation counter
         self.hashtag_rotation_counter[rotation_key] = current_index + 1
         
-        # If we need more hashtags, add from other sets
-        if len(hashtags) < count:
-            for other_key in set_keys:
-                if other_key != set_key:
-                    hashtags.extend(hashtag_sets[other_key])
-        
-        # Shuffle and select
-        random.shuffle(hashtags)
-        selected_hashtags = hashtags[:count]
+        # Sample from the rotated set, or from every set if it is too small
+        pool = hashtag_sets[set_key]
+        if len(pool) < count:
+            pool = all_hashtags
+        selected_hashtags = random.sample(pool, min(count, len(pool)))
         
         logger.info(f"Generated {len(selected_hashtags)} hashtags for {content_type}/{platform}")
         return selected_hashtags
     
+    def _get_hashtag_pools(self, content_type: str) -> Tuple[tuple, dict, tuple]:
+        """Get sorted set names, the sets, and all hashtags combined for a content type"""
+        pools = self._hashtag_pools.get(content_type)
+        
+        if pools is None:
+            hashtag_sets = self.config.get_hashtag_sets(content_type) or {}
+            set_keys = tuple(sorted(hashtag_sets.keys()))
+            sets = {key: tuple(hashtag_sets[key]) for key in set_keys}
+            all_hashtags = tuple(tag for key in set_keys for tag in sets[key])
+            pools = (set_keys, sets, all_hashtags)
+            self._hashtag_pools[content_type] = pools
+        
+        return pools
+    
     def format_hashtags(self, hashtags: List[str]) -> str:
         """
         Format hashtags for posting
@@ -242,7 +298,7 @@ Requirements:
         Returns:
             Formatted hashtag string with # prefix
         """
-        return ' '.join([f"#{tag}" for tag in hashtags])
+        return '#' + ' #'.join(hashtags) if hashtags else ''
     
     def generate_full_post_text(self, caption: str, hashtags: List[str], 
                                platform: str = 'instagram') -> str:
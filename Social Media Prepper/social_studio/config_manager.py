@@ -4,13 +4,51 @@ Handles loading and validating the config.yaml file
 """
 
 import os
+import copy
+import stat
+import pickle
 import yaml
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Parse with libyaml's C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+    logger.info("Using libyaml C loader for configuration")
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+    logger.info("Using pure-Python YAML loader - install libyaml for faster config loading")
+
+# Parsed config files, keyed by resolved path and validated against the file's
+# (mtime_ns, size, inode) so edits on disk are picked up on the next load
+_YAML_CACHE: "OrderedDict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]]" = OrderedDict()
+_YAML_CACHE_MAX = 100
+_YAML_CACHE_LOCK = threading.Lock()
+
+
+def _flatten(config: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """
+    Map every dot-notation path in a nested config to its value
+    
+    Sections are kept alongside their leaves, so 'processing' maps to the
+    whole subtree and 'processing.audio.format' to the leaf.
+    """
+    flat = {}
+    for key, value in config.items():
+        if not isinstance(key, str):
+            # get() only takes string keys
+            continue
+        path = prefix + key
+        flat[path] = value
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path + '.'))
+    return flat
+
 
 class ConfigManager:
     """Manages application configuration from config.yaml"""
@@ -29,6 +67,7 @@ class ConfigManager:
         
         self.config_path = Path(config_path)
         self.config = self._load_config()
+        self._flat = _flatten(self.config)  # dot-notation key -> value
         self._validate_config()
     
     def _load_config(self) -> Dict[str, Any]:
@@ -39,8 +78,30 @@ class ConfigManager:
                     f"Configuration file not found at {self.config_path}"
                 )
             
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            file_stat = self.config_path.stat()
+            signature = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+            cache_key = str(self.config_path.resolve())
+            
+            with _YAML_CACHE_LOCK:
+                cached = _YAML_CACHE.get(cache_key)
+                if cached is not None and cached[0] == signature:
+                    _YAML_CACHE.move_to_end(cache_key)
+                    # Hand out a copy so callers can't modify the cached entry
+                    return copy.deepcopy(cached[1])
+            
+            # A fresh process can skip YAML parsing via the pickled copy on disk
+            config = self._read_config_sidecar(signature)
+            if config is None:
+                # Hand the raw bytes to the parser, which does its own UTF-8 decoding
+                with open(self.config_path, 'rb') as f:
+                    config = yaml.load(f.read(), Loader=YamlLoader)
+                self._write_config_sidecar(signature, config)
+            
+            with _YAML_CACHE_LOCK:
+                _YAML_CACHE[cache_key] = (signature, copy.deepcopy(config))
+                _YAML_CACHE.move_to_end(cache_key)
+                while len(_YAML_CACHE) > _YAML_CACHE_MAX:
+                    _YAML_CACHE.popitem(last=False)
             
             logger.info(f"Configuration loaded from {self.config_path}")
             return config
@@ -52,6 +113,59 @@ class ConfigManager:
             logger.error(f"Error loading configuration: {e}")
             raise
     
+    def _get_sidecar_path(self) -> Path:
+        """Path of the pickled copy of the parsed config"""
+        return self.config_path.with_name(self.config_path.name + '.cache.pkl')
+    
+    def _read_config_sidecar(self, signature: Tuple[int, int, int]) -> Optional[Dict[str, Any]]:
+        """
+        Load the pickled config if it was made from the current file
+        
+        Only files owned by the current user and not accessible to anyone else
+        are unpickled, so another user can't plant one. Unsupported on
+        platforms without POSIX ownership.
+        """
+        if not hasattr(os, 'getuid'):
+            return None
+        
+        try:
+            fd = os.open(self._get_sidecar_path(), os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+        except OSError:
+            return None
+        
+        try:
+            with os.fdopen(fd, 'rb') as f:
+                file_stat = os.fstat(f.fileno())
+                if file_stat.st_uid != os.getuid() or stat.S_IMODE(file_stat.st_mode) != 0o600:
+                    return None
+                cached_signature, config = pickle.loads(f.read())
+        except Exception as e:
+            # Corrupt or unreadable cache - fall back to parsing the YAML
+            logger.debug(f"Ignoring config cache: {e}")
+            return None
+        
+        return config if cached_signature == signature else None
+    
+    def _write_config_sidecar(self, signature: Tuple[int, int, int], config: Dict[str, Any]):
+        """Save the parsed config next to the YAML file for later processes"""
+        if not hasattr(os, 'getuid'):
+            return
+        
+        sidecar = self._get_sidecar_path()
+        temp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pickle.dumps((signature, config), protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(temp_path, sidecar)
+        except Exception as e:
+            # Caching is best-effort, e.g. the config directory may be read-only
+            logger.debug(f"Could not write config cache: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+    
     def _validate_config(self):
         """Validate required configuration fields"""
         required_fields = ['brand', 'default_platforms', 'platforms', 
@@ -75,16 +189,7 @@ class ConfigManager:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
-        value = self.config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        
-        return value
+        return self._flat.get(key, default)
     
     def get_brand_name(self) -> str:
         """Get the brand name"""
@@ -118,7 +223,8 @@ class ConfigManager:
     
     def get_openai_config(self) -> Dict[str, Any]:
         """Get OpenAI configuration"""
-        openai_config = self.get('openai', {})
+        # Copy so the environment key isn't written back into the config
+        openai_config = dict(self.get('openai', {}))
         
         # Check for API key in environment variable if not in config
         if not openai_config.get('api_key'):
@@ -148,17 +254,27 @@ class ConfigManager:
     def reload(self):
         """Reload configuration from file"""
         self.config = self._load_config()
+        self._flat = _flatten(self.config)
         self._validate_config()
         logger.info("Configuration reloaded")
 
 
-# Singleton instance
-_config_manager = None
+# Shared instances, one per resolved config path
+_config_managers: Dict[str, ConfigManager] = {}
+_config_managers_lock = threading.Lock()
+
+
+def _resolve_config_path(config_path: Optional[str] = None) -> str:
+    """Resolve a config path to the absolute key used for shared instances"""
+    if config_path is None:
+        # Same default as ConfigManager
+        config_path = Path(__file__).parent.parent / "config" / "config.yaml"
+    return str(Path(config_path).resolve())
 
 
 def get_config_manager(config_path: Optional[str] = None) -> ConfigManager:
     """
-    Get or create the configuration manager singleton
+    Get or create the shared configuration manager for a config file
     
     Args:
         config_path: Optional custom path to config file
@@ -166,7 +282,21 @@ def get_config_manager(config_path: Optional[str] = None) -> ConfigManager:
     Returns:
         ConfigManager instance
     """
-    global _config_manager
-    if _config_manager is None:
-        _config_manager = ConfigManager(config_path)
-    return _config_manager
+    key = _resolve_config_path(config_path)
+    with _config_managers_lock:
+        config_manager = _config_managers.get(key)
+        if config_manager is None:
+            config_manager = ConfigManager(key)
+            _config_managers[key] = config_manager
+    return config_manager
+
+
+def invalidate_config_manager(config_path: Optional[str] = None):
+    """
+    Drop the shared configuration manager for a config file
+    
+    Args:
+        config_path: Optional custom path to config file
+    """
+    with _config_managers_lock:
+        _config_managers.pop(_resolve_config_path(config_path), None)
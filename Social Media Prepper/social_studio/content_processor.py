@@ -4,21 +4,129 @@ Handles image, video, and audio processing for social media content
 """
 
 import os
+import asyncio
+import functools
+import hashlib
+import itertools
 import logging
 import random
+import threading
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
+from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageOps
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# ContentProcessor methods that process_batch can run
+BATCH_METHODS = frozenset({
+    'process_audio', 'process_video', 'create_video_from_audio',
+    'clip_video', 'clip_audio'
+})
+
+# Hardware H.264 encoders in order of preference, with preset and rate-control args
+# aimed at roughly libx264's default quality (CRF 23); detection test-encodes with them
+HW_H264_ENCODERS = (
+    ('h264_nvenc', ['-preset', 'p4', '-rc', 'vbr', '-cq', '23', '-b:v', '0']),
+    ('h264_videotoolbox', ['-b:v', '6M', '-maxrate', '8M', '-bufsize', '12M']),
+    ('h264_qsv', ['-preset', 'medium', '-global_quality', '23']),
+)
+
+# Supported input file extensions per content type (lowercase)
+INPUT_EXTENSIONS = {
+    'music': frozenset({'.mp3', '.wav', '.m4a', '.flac', '.aac'}),
+    'images': frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}),
+    'videos': frozenset({'.mp4', '.mov', '.avi', '.mkv', '.webm'})
+}
+
+# Output (width, height) for each clip_video crop preset
+CROP_PRESET_DIMENSIONS = {
+    '9:16': (1080, 1920),
+    '1:1': (1080, 1080),
+    '4:5': (1080, 1350),
+    '16:9': (1920, 1080)
+}
+
+# Characters escaped in FFmpeg drawtext values
+DRAWTEXT_ESCAPES = str.maketrans({"'": "'\\\\\\''", ":": "\\:"})
+
+
+@functools.lru_cache(maxsize=128)
+def _escape_drawtext(text: str) -> str:
+    """Escape overlay text for FFmpeg's drawtext filter"""
+    return text.translate(DRAWTEXT_ESCAPES)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_overlay_font(font_size: int):
+    """Load the text overlay font once per size, falling back to Pillow's default font"""
+    try:
+        return ImageFont.truetype("arial.ttf", font_size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=64)
+def _render_overlay_text(text: str, font_size: int) -> tuple:
+    """
+    Rasterize overlay text once per text and size
+    
+    Returns (mask, left, top, width, height): the glyph coverage as an "L"
+    image and the ink box relative to the drawing position. Multi-line text
+    is measured and laid out exactly as draw.text does it. Callers must not
+    modify the mask.
+    """
+    font = _load_overlay_font(font_size)
+    # Measure through ImageDraw, which handles multi-line text (font.getbbox sees one line)
+    left, top, right, bottom = ImageDraw.Draw(Image.new('L', (0, 0))).textbbox((0, 0), text, font=font)
+    width, height = right - left, bottom - top
+    
+    # Draw the text so its ink fills the canvas; coverage over 0 with ink 255 is the coverage itself
+    mask = Image.new('L', (width, height), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font)  # Lays out every line
+    return mask, left, top, width, height
+
+
+# Decoded source images kept in memory (full-size RGB, so keep this small)
+IMAGE_DECODE_CACHE_SIZE = 8
+
+
+@functools.lru_cache(maxsize=IMAGE_DECODE_CACHE_SIZE)
+def _decode_image(path: str, mtime_ns: int) -> Image.Image:
+    """
+    Decode an image file to RGB, once per file version
+    
+    The returned image is shared between calls and must not be modified in place.
+    """
+    with Image.open(path) as img:
+        # Convert to RGB if necessary
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            return background
+        if img.mode != 'RGB':
+            return img.convert('RGB')
+        img.load()
+        return img.copy()
+
 
 class ContentProcessor:
     """Processes images, videos, and audio for social media platforms"""
     
+    # Result of the FFmpeg check, shared by all instances in this process
+    _ffmpeg_available: Optional[bool] = None
+    # Working hardware H.264 encoder, detected on first video job
+    _hw_encoder: Optional[str] = None
+    _hw_encoder_checked = False
+    _hw_encoder_lock = threading.Lock()  # Batch workers must wait for detection, not skip it
+    # crop preset -> (scale/crop filter chain, encode args) for clip_video
+    _clip_video_templates: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+    
     def __init__(self, config_manager):
         """
         Initialize the content processor
@@ -30,19 +138,240 @@ class ContentProcessor:
         self.project_root = Path(__file__).parent.parent
         self.input_dir = self.project_root / "input"
         self.output_dir = self.project_root / "output"
+        self._audio_codecs = {}  # (path, mtime_ns) -> codec name from ffprobe
+        self._clip_counter = itertools.count(1)  # Keeps same-second clips apart
+        self._logo_cache = {}  # (logo path, mtime_ns, width, opacity) -> (logo RGB, logo alpha)
+        self._load_settings()
+    
+    def _load_settings(self):
+        """Read the processing settings used by every media job"""
+        self._platform_configs = {}  # platform -> platform config, filled on first use
+        self._audio_config = self.config.get_processing_config('audio')
+        self._video_config = self.config.get_processing_config('video')
+        self._image_config = self.config.get_processing_config('image')
+        self._watermark_config = self.config.get_watermark_config()
+        self._image_targets = {}  # platform -> (width, height, format, quality)
+        self._video_dimensions = {}  # platform -> (width, height)
+    
+    def _get_platform_config(self, platform: str) -> Dict:
+        """Get a platform's configuration, looking it up once per platform"""
+        platform_config = self._platform_configs.get(platform)
+        if platform_config is None:
+            platform_config = self.config.get_platform_config(platform)
+            self._platform_configs[platform] = platform_config
+        return platform_config
+    
+    def reload_config(self):
+        """Reload the configuration file and refresh the cached settings"""
+        self.config.reload()
+        self._load_settings()
         
     def check_ffmpeg(self) -> bool:
-        """Check if FFmpeg is available"""
+        """Check if FFmpeg is available (runs FFmpeg only on the first call)"""
+        if ContentProcessor._ffmpeg_available is None:
+            try:
+                subprocess.run(['ffmpeg', '-version'], 
+                             capture_output=True, check=True)
+                ContentProcessor._ffmpeg_available = True
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                logger.warning("FFmpeg not found. Audio/video processing will be limited.")
+                ContentProcessor._ffmpeg_available = False
+        return ContentProcessor._ffmpeg_available
+    
+    def _probe_audio_codec(self, audio_path: Path) -> Optional[str]:
+        """Get the codec of a file's first audio stream, probing each file version once"""
+        key = (str(audio_path), audio_path.stat().st_mtime_ns)
+        if key not in self._audio_codecs:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+                 '-show_entries', 'stream=codec_name', '-of', 'default=nk=1:nw=1',
+                 str(audio_path)],
+                capture_output=True, text=True
+            )
+            codec = result.stdout.strip() if result.returncode == 0 else ''
+            self._audio_codecs[key] = codec or None
+        return self._audio_codecs[key]
+    
+    def _mp3_codec_args(self, audio_path: Path) -> List[str]:
+        """Codec args for MP3 output - stream copy when the input is already MP3"""
         try:
-            subprocess.run(['ffmpeg', '-version'], 
-                         capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            logger.warning("FFmpeg not found. Audio/video processing will be limited.")
+            is_mp3 = self._probe_audio_codec(audio_path) == 'mp3'
+        except (OSError, subprocess.SubprocessError):
+            is_mp3 = False
+        if is_mp3:
+            # Cutting only rewrites the container, no re-encode needed
+            return ['-c', 'copy']
+        return ['-acodec', 'libmp3lame', '-b:a', '192k']
+    
+    def _detect_hw_encoder(self) -> Optional[str]:
+        """
+        Find a hardware H.264 encoder that works on this machine
+        
+        FFmpeg builds often list encoders whose hardware isn't present, so each
+        candidate is tried on a tiny test clip. Set SS_FORCE_SW_ENCODE=1 to
+        always use libx264.
+        """
+        if ContentProcessor._hw_encoder_checked:
+            return ContentProcessor._hw_encoder
+        
+        with ContentProcessor._hw_encoder_lock:
+            if not ContentProcessor._hw_encoder_checked:
+                if os.environ.get('SS_FORCE_SW_ENCODE') != '1':
+                    ContentProcessor._hw_encoder = self._probe_hw_encoders()
+                # Only mark detection done once the encoder has its final value
+                ContentProcessor._hw_encoder_checked = True
+        return ContentProcessor._hw_encoder
+    
+    def _probe_hw_encoders(self) -> Optional[str]:
+        """Test-encode with each listed hardware encoder and return the first that works"""
+        try:
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                    capture_output=True, text=True)
+            for encoder, preset_args in HW_H264_ENCODERS:
+                if encoder not in result.stdout:
+                    continue
+                test = subprocess.run(
+                    ['ffmpeg', '-hide_banner', '-f', 'lavfi',
+                     '-i', 'color=c=black:s=256x256:d=0.1',
+                     '-c:v', encoder, *preset_args, '-pix_fmt', 'yuv420p',
+                     '-f', 'null', '-'],
+                    capture_output=True, text=True
+                )
+                if test.returncode == 0:
+                    logger.info(f"Using hardware video encoder: {encoder}")
+                    return encoder
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Hardware encoder detection failed: {e}")
+        return None
+    
+    def _video_codec_args(self, video_codec: str = 'libx264',
+                          preset: Optional[str] = None) -> List[str]:
+        """Video codec args, swapping libx264 for a hardware encoder when one works"""
+        if video_codec == 'libx264':
+            hw_encoder = self._detect_hw_encoder()
+            if hw_encoder:
+                return ['-c:v', hw_encoder, *dict(HW_H264_ENCODERS)[hw_encoder]]
+        if preset:
+            return ['-c:v', video_codec, '-preset', preset]
+        return ['-c:v', video_codec]
+    
+    def _get_clip_video_template(self, crop_preset: str) -> Tuple[str, Tuple[str, ...]]:
+        """Get the per-preset parts of the clip_video command, building them once"""
+        template = ContentProcessor._clip_video_templates.get(crop_preset)
+        if template is None:
+            width, height = CROP_PRESET_DIMENSIONS.get(crop_preset, (1080, 1920))
+            base_filters = (f'scale={width}:{height}:force_original_aspect_ratio=increase,'
+                            f'crop={width}:{height}')
+            encode_args = (
+                *self._video_codec_args('libx264', preset='medium'),
+                '-c:a', 'aac',
+                '-b:a', '192k'
+            )
+            template = (base_filters, encode_args)
+            ContentProcessor._clip_video_templates[crop_preset] = template
+        return template
+    
+    def _get_video_dimensions(self, platform: str) -> Tuple[int, int]:
+        """Get a platform's video (width, height), resolving it once"""
+        dimensions = self._video_dimensions.get(platform)
+        if dimensions is None:
+            video_dimensions = self._get_platform_config(platform).get('video_dimensions', {})
+            dimensions = (video_dimensions.get('width', 1080), video_dimensions.get('height', 1920))
+            self._video_dimensions[platform] = dimensions
+        return dimensions
+    
+    def _get_image_target(self, platform: str) -> Tuple[int, int, str, int]:
+        """Get a platform's image (width, height, format, quality), resolving it once"""
+        target = self._image_targets.get(platform)
+        if target is None:
+            platform_config = self._get_platform_config(platform)
+            dimensions = platform_config.get('image_dimensions', {'width': 1080, 'height': 1080})
+            img_format = self._image_config.get('format', 'jpg').upper()
+            if img_format == 'JPG':
+                img_format = 'JPEG'
+            target = (
+                dimensions.get('width', 1080),
+                dimensions.get('height', 1080),
+                img_format,
+                self._image_config.get('quality', 90)
+            )
+            self._image_targets[platform] = target
+        return target
+    
+    def _get_clip_stamp(self) -> str:
+        """Get a unique timestamp-and-counter stamp for a clip filename"""
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{next(self._clip_counter)}"
+    
+    def _get_build_stamp(self, input_paths: List[Path], settings) -> str:
+        """Fingerprint a job from its input file versions and everything that shapes the output"""
+        inputs = []
+        for input_path in input_paths:
+            file_stat = input_path.stat()
+            inputs.append((str(input_path), file_stat.st_mtime_ns, file_stat.st_size))
+        return hashlib.blake2b(repr((inputs, settings)).encode('utf-8'),
+                               digest_size=16).hexdigest()
+    
+    def _is_up_to_date(self, output_path: Path, build_stamp: str) -> bool:
+        """
+        Check if an output was already built by an identical job
+        
+        Clears a stale stamp so an interrupted rebuild is never mistaken
+        for a finished one.
+        """
+        stamp_path = output_path.with_name(output_path.name + '.stamp')
+        try:
+            if output_path.exists() and stamp_path.read_text() == build_stamp:
+                logger.info(f"Skipping, already up to date: {output_path}")
+                return True
+        except OSError:
+            pass
+        stamp_path.unlink(missing_ok=True)
+        return False
+    
+    def _mark_up_to_date(self, output_path: Path, build_stamp: str):
+        """Record the job that built an output"""
+        output_path.with_name(output_path.name + '.stamp').write_text(build_stamp)
+    
+    def _run_ffmpeg(self, cmd: List[str]) -> bool:
+        """Run an FFmpeg command, logging its output on failure"""
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error(f"FFmpeg error: {result.stderr}")
             return False
+        return True
+    
+    async def process_batch(self, jobs: List[Tuple[str, tuple]],
+                            max_parallel: Optional[int] = None) -> List[Optional[Path]]:
+        """
+        Run several FFmpeg jobs at once
+        
+        Args:
+            jobs: (method name, positional args) pairs, e.g.
+                ('clip_audio', (audio_path, output_dir, 0, 15))
+            max_parallel: Jobs to run at the same time (None = half the CPU cores,
+                since FFmpeg already uses several threads per job)
+        
+        Returns:
+            Output paths in job order (None for failed jobs)
+        """
+        for method_name, _ in jobs:
+            if method_name not in BATCH_METHODS:
+                raise ValueError(f"Unsupported batch method: {method_name}")
+        
+        if max_parallel is None:
+            max_parallel = max(1, (os.cpu_count() or 2) // 2)
+        semaphore = asyncio.Semaphore(max_parallel)
+        
+        async def run_job(method_name: str, args: tuple) -> Optional[Path]:
+            async with semaphore:
+                # The methods block on FFmpeg, so each one waits in a worker thread
+                return await asyncio.to_thread(getattr(self, method_name), *args)
+        
+        return await asyncio.gather(*(run_job(name, args) for name, args in jobs))
     
     def process_audio(self, audio_path: Path, output_dir: Path, 
-                     duration: Optional[int] = None) -> Optional[Path]:
+                     duration: Optional[int] = None,
+                     force: bool = False) -> Optional[Path]:
         """
         Process audio file (clip to specified duration)
         
@@ -50,6 +379,7 @@ class ContentProcessor:
             audio_path: Path to input audio file
             output_dir: Directory to save processed audio
             duration: Duration in seconds (None = use config)
+            force: Rebuild even if the output is up to date
             
         Returns:
             Path to processed audio file or None if failed
@@ -61,13 +391,12 @@ class ContentProcessor:
         try:
             # Get duration from config if not provided
             if duration is None:
-                audio_config = self.config.get_processing_config('audio')
-                min_dur = audio_config.get('clip_duration_min', 10)
-                max_dur = audio_config.get('clip_duration_max', 15)
+                min_dur = self._audio_config.get('clip_duration_min', 10)
+                max_dur = self._audio_config.get('clip_duration_max', 15)
                 duration = random.randint(min_dur, max_dur)
             
             # Get audio format
-            audio_format = self.config.get('processing.audio.format', 'mp3')
+            audio_format = self._audio_config.get('format', 'mp3')
             
             # Create output filename
             output_filename = f"{audio_path.stem}_clip.{audio_format}"
@@ -81,17 +410,19 @@ class ContentProcessor:
                 'ffmpeg', '-y',  # Overwrite output file
                 '-i', str(audio_path),
                 '-t', str(duration),  # Duration
-                '-acodec', 'libmp3lame' if audio_format == 'mp3' else 'copy',
-                '-b:a', '192k',  # Bitrate
+                *(self._mp3_codec_args(audio_path) if audio_format == 'mp3'
+                  else ['-acodec', 'copy', '-b:a', '192k']),
                 str(output_path)
             ]
             
-            logger.info(f"Clipping audio: {audio_path.name} to {duration}s")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            build_stamp = self._get_build_stamp([audio_path], cmd)
+            if not force and self._is_up_to_date(output_path, build_stamp):
+                return output_path
             
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr}")
+            logger.info(f"Clipping audio: {audio_path.name} to {duration}s")
+            if not self._run_ffmpeg(cmd):
                 return None
+            self._mark_up_to_date(output_path, build_stamp)
             
             logger.info(f"Audio processed: {output_path}")
             return output_path
@@ -102,7 +433,8 @@ class ContentProcessor:
     
     def create_video_from_audio(self, audio_path: Path, output_dir: Path, 
                                 platform: str = 'instagram',
-                                background_image: Optional[Path] = None) -> Optional[Path]:
+                                background_image: Optional[Path] = None,
+                                force: bool = False) -> Optional[Path]:
         """
         Create a video with audio and static/animated background
         
@@ -111,6 +443,7 @@ class ContentProcessor:
             output_dir: Directory to save video
             platform: Target platform for dimensions
             background_image: Optional background image
+            force: Rebuild even if the output is up to date
             
         Returns:
             Path to created video or None if failed
@@ -121,12 +454,10 @@ class ContentProcessor:
         
         try:
             # Get platform dimensions
-            platform_config = self.config.get_platform_config(platform)
-            width = platform_config.get('video_dimensions', {}).get('width', 1080)
-            height = platform_config.get('video_dimensions', {}).get('height', 1920)
+            width, height = self._get_video_dimensions(platform)
             
             # Get video settings
-            video_config = self.config.get_processing_config('video')
+            video_config = self._video_config
             fps = video_config.get('fps', 30)
             video_codec = video_config.get('video_codec', 'libx264')
             audio_codec = video_config.get('audio_codec', 'aac')
@@ -138,14 +469,16 @@ class ContentProcessor:
             # Ensure output directory exists
             output_dir.mkdir(parents=True, exist_ok=True)
             
+            input_paths = [audio_path]
             if background_image and background_image.exists():
+                input_paths.append(background_image)
                 # Create video from image + audio
                 cmd = [
                     'ffmpeg', '-y',
                     '-loop', '1',
                     '-i', str(background_image),
                     '-i', str(audio_path),
-                    '-c:v', video_codec,
+                    *self._video_codec_args(video_codec),
                     '-c:a', audio_codec,
                     '-b:a', '192k',
                     '-vf', f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}',
@@ -161,7 +494,7 @@ class ContentProcessor:
                     '-f', 'lavfi',
                     '-i', f'color=c=black:s={width}x{height}:r={fps}',
                     '-i', str(audio_path),
-                    '-c:v', video_codec,
+                    *self._video_codec_args(video_codec),
                     '-c:a', audio_codec,
                     '-b:a', '192k',
                     '-shortest',
@@ -169,12 +502,14 @@ class ContentProcessor:
                     str(output_path)
                 ]
             
-            logger.info(f"Creating video for {platform}: {audio_path.name}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            build_stamp = self._get_build_stamp(input_paths, cmd)
+            if not force and self._is_up_to_date(output_path, build_stamp):
+                return output_path
             
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr}")
+            logger.info(f"Creating video for {platform}: {audio_path.name}")
+            if not self._run_ffmpeg(cmd):
                 return None
+            self._mark_up_to_date(output_path, build_stamp)
             
             logger.info(f"Video created: {output_path}")
             return output_path
@@ -184,7 +519,8 @@ class ContentProcessor:
             return None
     
     def process_video(self, video_path: Path, output_dir: Path, 
-                     platform: str = 'instagram') -> Optional[Path]:
+                     platform: str = 'instagram',
+                     force: bool = False) -> Optional[Path]:
         """
         Process video file (resize, clip, format conversion)
         
@@ -192,6 +528,7 @@ class ContentProcessor:
             video_path: Path to input video
             output_dir: Directory to save processed video
             platform: Target platform
+            force: Rebuild even if the output is up to date
             
         Returns:
             Path to processed video or None if failed
@@ -202,12 +539,10 @@ class ContentProcessor:
         
         try:
             # Get platform dimensions
-            platform_config = self.config.get_platform_config(platform)
-            width = platform_config.get('video_dimensions', {}).get('width', 1080)
-            height = platform_config.get('video_dimensions', {}).get('height', 1920)
+            width, height = self._get_video_dimensions(platform)
             
             # Get video settings
-            video_config = self.config.get_processing_config('video')
+            video_config = self._video_config
             fps = video_config.get('fps', 30)
             video_codec = video_config.get('video_codec', 'libx264')
             audio_codec = video_config.get('audio_codec', 'aac')
@@ -223,7 +558,7 @@ class ContentProcessor:
             cmd = [
                 'ffmpeg', '-y',
                 '-i', str(video_path),
-                '-c:v', video_codec,
+                *self._video_codec_args(video_codec),
                 '-c:a', audio_codec,
                 '-b:a', '192k',
                 '-vf', f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}',
@@ -232,12 +567,14 @@ class ContentProcessor:
                 str(output_path)
             ]
             
-            logger.info(f"Processing video for {platform}: {video_path.name}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            build_stamp = self._get_build_stamp([video_path], cmd)
+            if not force and self._is_up_to_date(output_path, build_stamp):
+                return output_path
             
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr}")
+            logger.info(f"Processing video for {platform}: {video_path.name}")
+            if not self._run_ffmpeg(cmd):
                 return None
+            self._mark_up_to_date(output_path, build_stamp)
             
             logger.info(f"Video processed: {output_path}")
             return output_path
@@ -248,7 +585,8 @@ class ContentProcessor:
     
     def process_image(self, image_path: Path, output_dir: Path, 
                      platform: str = 'instagram',
-                     add_text: Optional[str] = None) -> Optional[Path]:
+                     add_text: Optional[str] = None,
+                     force: bool = False) -> Optional[Path]:
         """
         Process image (resize, add watermark, add text overlay)
         
@@ -257,23 +595,14 @@ class ContentProcessor:
             output_dir: Directory to save processed image
             platform: Target platform
             add_text: Optional text to overlay
+            force: Rebuild even if the output is up to date
             
         Returns:
             Path to processed image or None if failed
         """
         try:
-            # Get platform dimensions
-            platform_config = self.config.get_platform_config(platform)
-            dimensions = platform_config.get('image_dimensions', {'width': 1080, 'height': 1080})
-            target_width = dimensions.get('width', 1080)
-            target_height = dimensions.get('height', 1080)
-            
-            # Get image settings
-            image_config = self.config.get_processing_config('image')
-            img_format = image_config.get('format', 'jpg').upper()
-            if img_format == 'JPG':
-                img_format = 'JPEG'
-            quality = image_config.get('quality', 90)
+            # Get platform dimensions and image settings
+            target_width, target_height, img_format, quality = self._get_image_target(platform)
             
             # Create output filename
             output_filename = f"{image_path.stem}_{platform}.jpg"
@@ -282,53 +611,36 @@ class ContentProcessor:
             # Ensure output directory exists
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Open and process image
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Resize image (cover fit - crop to exact dimensions)
-                img_ratio = img.width / img.height
-                target_ratio = target_width / target_height
-                
-                if img_ratio > target_ratio:
-                    # Image is wider, scale by height
-                    new_height = target_height
-                    new_width = int(new_height * img_ratio)
-                else:
-                    # Image is taller, scale by width
-                    new_width = target_width
-                    new_height = int(new_width / img_ratio)
-                
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                # Crop to target dimensions (center crop)
-                left = (new_width - target_width) // 2
-                top = (new_height - target_height) // 2
-                right = left + target_width
-                bottom = top + target_height
-                img = img.crop((left, top, right, bottom))
-                
-                # Add text overlay if provided
-                if add_text:
-                    img = self._add_text_overlay(img, add_text)
-                
-                # Add watermark if enabled
-                watermark_config = self.config.get_watermark_config()
-                if watermark_config.get('enabled', False):
-                    logo_path = self.config.get('brand.logo_path')
-                    if logo_path and Path(logo_path).exists():
-                        img = self._add_watermark(img, Path(logo_path), watermark_config)
-                
-                # Save image
-                img.save(output_path, img_format, quality=quality, optimize=True)
+            # Skip the work if this output was already made from the same inputs and settings
+            watermark_config = self._watermark_config
+            logo_path = self.config.get('brand.logo_path')
+            use_watermark = (watermark_config.get('enabled', False)
+                             and bool(logo_path) and Path(logo_path).exists())
+            input_paths = [image_path, Path(logo_path)] if use_watermark else [image_path]
+            build_stamp = self._get_build_stamp(input_paths, (
+                platform, target_width, target_height, img_format, quality,
+                add_text, watermark_config if use_watermark else None
+            ))
+            if not force and self._is_up_to_date(output_path, build_stamp):
+                return output_path
+            
+            # Decode once per file version; the result is shared, so only derive new images from it
+            img = _decode_image(str(image_path), image_path.stat().st_mtime_ns)
+            
+            # Cover fit and center crop in one resample, so pixels that
+            # would be cropped away are never resized
+            img = ImageOps.fit(img, (target_width, target_height),
+                               Image.Resampling.LANCZOS, centering=(0.5, 0.5))
+            
+            # Add text overlay if provided and watermark if enabled
+            if add_text or use_watermark:
+                img = self._apply_overlays(img, add_text,
+                                           Path(logo_path) if use_watermark else None,
+                                           watermark_config)
+            
+            # Save image
+            img.save(output_path, img_format, quality=quality, optimize=True)
+            self._mark_up_to_date(output_path, build_stamp)
             
             logger.info(f"Image processed for {platform}: {output_path}")
             return output_path
@@ -337,6 +649,35 @@ class ContentProcessor:
             logger.error(f"Error processing image {image_path}: {e}")
             return None
     
+    def process_image_batch(self, jobs: List[Tuple[Path, Path, str, Optional[str]]],
+                            max_workers: Optional[int] = None) -> List[Optional[Path]]:
+        """
+        Process several images at once
+        
+        Pillow releases the GIL while decoding, resampling and encoding, so
+        threads scale across cores without pickling images between processes.
+        
+        Args:
+            jobs: (image_path, output_dir, platform, add_text) tuples
+            max_workers: Worker threads (None = one per CPU core)
+        
+        Returns:
+            Output paths in job order (None for failed jobs)
+        """
+        if len(jobs) < 2:
+            return [self.process_image(*job) for job in jobs]
+        
+        # Build each watermark size up front so workers share it instead of racing to build it
+        watermark_config = self._watermark_config
+        logo_path = self.config.get('brand.logo_path')
+        if watermark_config.get('enabled', False) and logo_path and Path(logo_path).exists():
+            opacity = watermark_config.get('opacity', 0.7)
+            for target_width in {self._get_image_target(job[2])[0] for job in jobs}:
+                self._get_watermark_logo(Path(logo_path), int(target_width * 0.1), opacity)
+        
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(lambda job: self.process_image(*job), jobs))
+    
     def clip_video(self, video_path: Path, output_dir: Path, 
                    start_time: float, duration: float,
                    platform: str = 'instagram',
@@ -364,38 +705,24 @@ class ContentProcessor:
             return None
         
         try:
-            # Get platform dimensions based on crop preset
-            dimensions_map = {
-                '9:16': {'width': 1080, 'height': 1920},
-                '1:1': {'width': 1080, 'height': 1080},
-                '4:5': {'width': 1080, 'height': 1350},
-                '16:9': {'width': 1920, 'height': 1080}
-            }
-            
-            dims = dimensions_map.get(crop_preset, {'width': 1080, 'height': 1920})
-            width = dims['width']
-            height = dims['height']
+            # Filters and encode args depend only on the crop preset
+            base_filters, encode_args = self._get_clip_video_template(crop_preset)
             
             # Create output filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = self._get_clip_stamp()
             output_filename = f"{video_path.stem}_{platform}_{timestamp}.mp4"
             output_path = output_dir / output_filename
             
             # Ensure output directory exists
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Build FFmpeg filter chain
-            vf_filters = [
-                f'scale={width}:{height}:force_original_aspect_ratio=increase',
-                f'crop={width}:{height}'
-            ]
-            
             # Add text overlay if specified
+            vf = base_filters
             if text_overlay:
                 # Escape special characters for FFmpeg
-                escaped_text = text_overlay.replace("'", "'\\\\\\''").replace(":", "\\:")
-                vf_filters.append(
-                    f"drawtext=text='{escaped_text}':"
+                escaped_text = _escape_drawtext(text_overlay)
+                vf += (
+                    f",drawtext=text='{escaped_text}':"
                     f"fontsize=48:fontcolor={text_color}:x=(w-text_w)/2:y=(h-text_h)*0.8"
                 )
             
@@ -405,21 +732,15 @@ class ContentProcessor:
                 '-ss', str(start_time),
                 '-i', str(video_path),
                 '-t', str(duration),
-                '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-b:a', '192k',
-                '-vf', ','.join(vf_filters),
+                *encode_args,
+                '-vf', vf,
                 '-r', '30',
                 '-pix_fmt', 'yuv420p',
-                '-preset', 'medium',
                 str(output_path)
             ]
             
             logger.info(f"Clipping video: {video_path.name} ({start_time}s, {duration}s, {crop_preset})")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr}")
+            if not self._run_ffmpeg(cmd):
                 return None
             
             logger.info(f"Video clipped: {output_path}")
@@ -451,7 +772,7 @@ class ContentProcessor:
         
         try:
             # Create output filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = self._get_clip_stamp()
             output_filename = f"{audio_path.stem}_{platform}_{timestamp}.mp3"
             output_path = output_dir / output_filename
             
@@ -464,16 +785,12 @@ class ContentProcessor:
                 '-ss', str(start_time),
                 '-i', str(audio_path),
                 '-t', str(duration),
-                '-acodec', 'libmp3lame',
-                '-b:a', '192k',
+                *self._mp3_codec_args(audio_path),
                 str(output_path)
             ]
             
             logger.info(f"Clipping audio: {audio_path.name} ({start_time}s, {duration}s)")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr}")
+            if not self._run_ffmpeg(cmd):
                 return None
             
             logger.info(f"Audio clipped: {output_path}")
@@ -483,22 +800,29 @@ class ContentProcessor:
             logger.error(f"Error clipping audio {audio_path}: {e}")
             return None
     
+    def _apply_overlays(self, img: Image.Image, text: Optional[str],
+                        logo_path: Optional[Path], watermark_config: Dict) -> Image.Image:
+        """Draw the text overlay and watermark onto one RGB image in a single pass"""
+        # Both overlays draw in place, so the image is converted at most once, up front
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        if text:
+            img = self._add_text_overlay(img, text)
+        if logo_path is not None:
+            img = self._add_watermark(img, logo_path, watermark_config)
+        
+        return img
+    
     def _add_text_overlay(self, img: Image.Image, text: str) -> Image.Image:
         """Add text overlay to image"""
         try:
             draw = ImageDraw.Draw(img)
             
-            # Try to use a nice font, fall back to default if not available
-            try:
-                font_size = int(img.height * 0.08)  # 8% of image height
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
-            
-            # Get text bounding box
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
+            # Text is rendered once per text and font size (8% of image height), so a
+            # batch with one caption rasterizes it once per output size
+            font_size = int(img.height * 0.08)
+            text_mask, left, top, text_width, text_height = _render_overlay_text(text, font_size)
             
             # Position text at bottom center
             x = (img.width - text_width) // 2
@@ -511,55 +835,86 @@ class ContentProcessor:
                 fill=(0, 0, 0, 180)
             )
             
-            # Draw text
-            draw.text((x, y), text, fill=(255, 255, 255), font=font)
+            # Draw text by blending the prerendered glyphs in, exactly as draw.text would
+            draw.bitmap((x + left, y + top), text_mask, fill=(255, 255, 255))
             
             return img
         except Exception as e:
             logger.warning(f"Could not add text overlay: {e}")
             return img
     
+    def _get_watermark_logo(self, logo_path: Path, logo_width: int,
+                            opacity: float) -> Tuple[Optional[Image.Image], Optional[Image.Image],
+                                                     Tuple[int, int], Tuple[int, int]]:
+        """
+        Get the logo ready to paste: scaled to a width, split into its RGB
+        bands and an alpha mask with opacity applied, and cropped to its
+        visible pixels so the blend skips transparent margins
+        
+        Returns (logo_rgb, alpha, (left, top) of the crop, full logo size);
+        logo_rgb and alpha are None if the logo has no visible pixels, and
+        alpha alone is None when the crop is fully opaque (pasted as a plain copy).
+        Built once per (logo file, width, opacity); callers must not modify it.
+        """
+        key = (str(logo_path), logo_path.stat().st_mtime_ns, logo_width, opacity)
+        logo = self._logo_cache.get(key)
+        if logo is None:
+            with Image.open(logo_path) as source:
+                logo_height = int(logo_width * source.height / source.width)
+                # Let JPEG logos decode at reduced size; no-op for other formats
+                source.draft(None, (logo_width * 2, logo_height * 2))
+                # Bilinear is indistinguishable from Lanczos at watermark size
+                logo = source.resize((logo_width, logo_height), Image.Resampling.BILINEAR)
+            
+            # Adjust opacity
+            if logo.mode != 'RGBA':
+                logo = logo.convert('RGBA')
+            alpha = logo.split()[3]
+            alpha = ImageEnhance.Brightness(alpha).enhance(opacity)
+            
+            # Crop to the visible pixels; fully transparent margins would blend to no-ops
+            box = alpha.getbbox()
+            if box is None:
+                logo = (None, None, (0, 0), logo.size)
+            else:
+                alpha = alpha.crop(box)
+                if alpha.getextrema() == (255, 255):
+                    alpha = None
+                logo = (logo.convert('RGB').crop(box), alpha, box[:2], logo.size)
+            self._logo_cache[key] = logo
+        return logo
+    
     def _add_watermark(self, img: Image.Image, logo_path: Path, 
                       watermark_config: Dict) -> Image.Image:
-        """Add watermark/logo to image"""
+        """Add watermark/logo to image (drawn in place on RGB images, like the text overlay)"""
         try:
-            with Image.open(logo_path) as logo:
-                # Resize logo to appropriate size (10% of image width)
-                logo_width = int(img.width * 0.1)
-                logo_ratio = logo.height / logo.width
-                logo_height = int(logo_width * logo_ratio)
-                logo = logo.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
-                
-                # Adjust opacity
-                if logo.mode != 'RGBA':
-                    logo = logo.convert('RGBA')
-                
-                opacity = watermark_config.get('opacity', 0.7)
-                alpha = logo.split()[3]
-                alpha = ImageEnhance.Brightness(alpha).enhance(opacity)
-                logo.putalpha(alpha)
-                
-                # Position logo
-                position = watermark_config.get('position', 'bottom_right')
-                padding = 20
-                
-                if position == 'top_left':
-                    x, y = padding, padding
-                elif position == 'top_right':
-                    x, y = img.width - logo_width - padding, padding
-                elif position == 'bottom_left':
-                    x, y = padding, img.height - logo_height - padding
-                elif position == 'bottom_right':
-                    x, y = img.width - logo_width - padding, img.height - logo_height - padding
-                else:  # center
-                    x = (img.width - logo_width) // 2
-                    y = (img.height - logo_height) // 2
-                
-                # Paste logo
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                img.paste(logo, (x, y), logo)
+            # Logo at 10% of image width with the configured opacity
+            opacity = watermark_config.get('opacity', 0.7)
+            logo_rgb, logo_alpha, (left, top), (logo_width, logo_height) = \
+                self._get_watermark_logo(logo_path, int(img.width * 0.1), opacity)
+            
+            # Position logo
+            position = watermark_config.get('position', 'bottom_right')
+            padding = 20
+            
+            if position == 'top_left':
+                x, y = padding, padding
+            elif position == 'top_right':
+                x, y = img.width - logo_width - padding, padding
+            elif position == 'bottom_left':
+                x, y = padding, img.height - logo_height - padding
+            elif position == 'bottom_right':
+                x, y = img.width - logo_width - padding, img.height - logo_height - padding
+            else:  # center
+                x = (img.width - logo_width) // 2
+                y = (img.height - logo_height) // 2
+            
+            # Paste the logo's visible part, blending straight into the RGB image through
+            # the alpha mask (a plain copy when the logo is fully opaque)
+            if img.mode != 'RGB':
                 img = img.convert('RGB')
+            if logo_rgb is not None:
+                img.paste(logo_rgb, (x + left, y + top), logo_alpha)
             
             return img
         except Exception as e:
@@ -582,19 +937,14 @@ class ContentProcessor:
             logger.warning(f"Input directory not found: {input_subdir}")
             return []
         
-        # Define supported extensions
-        extensions = {
-            'music': ['.mp3', '.wav', '.m4a', '.flac', '.aac'],
-            'images': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'],
-            'videos': ['.mp4', '.mov', '.avi', '.mkv', '.webm']
-        }
-        
-        supported_ext = extensions.get(content_type, [])
+        supported_ext = INPUT_EXTENSIONS.get(content_type, frozenset())
         
-        # Find all supported files
-        files = []
-        for ext in supported_ext:
-            files.extend(input_subdir.glob(f'*{ext}'))
-            files.extend(input_subdir.glob(f'*{ext.upper()}'))
+        # Find all supported files in one directory pass, matching extensions in any case.
+        # DirEntry.is_file() answers from the directory listing, so no per-file stat
+        with os.scandir(input_subdir) as entries:
+            paths = sorted((entry.path for entry in entries
+                            if os.path.splitext(entry.name)[1].lower() in supported_ext
+                            and entry.is_file()), key=os.path.normcase)
         
-        return sorted(files)
+        # Sort the plain path strings (in Path order), then build Path objects once at the end
+        return [Path(path) for path in paths]
@@ -4,14 +4,24 @@ Handles exporting post metadata to CSV and JSON for social media schedulers
 """
 
 import csv
+import io
+import itertools
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Write buffer for export files, so large exports reach the disk in few writes
+EXPORT_WRITE_BUFFER_SIZE = 1 << 20
+
 
 class ExportManager:
     """Manages exporting post data to scheduler-compatible formats"""
@@ -26,121 +36,245 @@ class ExportManager:
         self.config = config_manager
         self.project_root = Path(__file__).parent.parent
         self.export_dir = self.project_root / "scheduler_export"
-        
-        # Ensure export directory exists
-        self.export_dir.mkdir(parents=True, exist_ok=True)
+        self._export_counter = itertools.count(1)  # Keeps same-second exports apart
+        self._export_dir_ready = False  # Export directory is created on first write
+    
+    def _ensure_export_dir(self):
+        """Create the export directory the first time a file is written to it"""
+        if not self._export_dir_ready:
+            self.export_dir.mkdir(parents=True, exist_ok=True)
+            self._export_dir_ready = True
     
-    def export_posts(self, posts: List[Dict], scheduler: str = 'generic') -> Dict[str, Path]:
+    def export_posts(self, posts: List[Dict], scheduler: str = 'generic',
+                     in_memory: bool = False,
+                     include_instructions: bool = False) -> Dict[str, Any]:
         """
         Export posts to scheduler-compatible format
         
         Args:
             posts: List of post metadata dictionaries
             scheduler: Target scheduler ('buffer', 'publer', 'later', 'meta', 'generic')
+            in_memory: Return (filename, bytes) pairs instead of writing files
+            include_instructions: Also add upload instructions for the exported
+                files under 'instructions', named with the batch's stamp
             
         Returns:
-            Dictionary with paths to exported files
+            Dictionary with paths to exported files, or (filename, bytes)
+            tuples when in_memory is True
         """
+        # Nothing to export - skip the timestamp and all file work
+        if not posts:
+            logger.info(f"No posts to export for {scheduler}")
+            return {}
+        
         export_config = self.config.get_export_config()
         exported_files = {}
         
+        # One timestamp for the whole batch so its files share a name stem
+        exported_at = datetime.now()
+        stamp = self._get_export_stamp(exported_at)
+        
         # Export CSV if enabled
         if export_config.get('include_csv', True):
-            csv_path = self.export_to_csv(posts, scheduler)
-            if csv_path:
-                exported_files['csv'] = csv_path
+            if in_memory:
+                csv_text = self._render_csv(posts, scheduler)
+                if csv_text is not None:
+                    exported_files['csv'] = (self._get_export_filename(scheduler, 'csv', stamp),
+                                             csv_text.encode('utf-8'))
+            else:
+                csv_path = self.export_to_csv(posts, scheduler, stamp)
+                if csv_path:
+                    exported_files['csv'] = csv_path
         
         # Export JSON if enabled
         if export_config.get('include_json', True):
-            json_path = self.export_to_json(posts, scheduler)
-            if json_path:
-                exported_files['json'] = json_path
+            if in_memory:
+                json_bytes = self._render_json(posts, scheduler, exported_at)
+                if json_bytes is not None:
+                    exported_files['json'] = (self._get_export_filename(scheduler, 'json', stamp),
+                                              json_bytes)
+            else:
+                json_path = self.export_to_json(posts, scheduler, stamp, exported_at)
+                if json_path:
+                    exported_files['json'] = json_path
+        
+        # Instructions share the batch stamp so they sit next to the files they describe
+        if include_instructions and exported_files:
+            if in_memory:
+                file_names = {file_type: file_name
+                              for file_type, (file_name, _) in exported_files.items()}
+                instructions = self.create_upload_instructions(scheduler, file_names)
+                exported_files['instructions'] = (self._get_instructions_filename(scheduler, stamp),
+                                                  instructions.encode('utf-8'))
+            else:
+                instructions_path = self.save_instructions(scheduler, dict(exported_files), stamp)
+                if instructions_path:
+                    exported_files['instructions'] = instructions_path
         
         logger.info(f"Exported {len(posts)} posts for {scheduler}")
         return exported_files
     
-    def export_to_csv(self, posts: List[Dict], scheduler: str = 'generic') -> Path | None:
+    def export_to_csv(self, posts: List[Dict], scheduler: str = 'generic',
+                      stamp: Optional[str] = None) -> Path | None:
         """
         Export posts to CSV format
         
         Args:
             posts: List of post metadata dictionaries
             scheduler: Target scheduler
+            stamp: Filename stamp shared with the rest of the batch (None = new stamp)
             
         Returns:
-            Path to exported CSV file or None if error
+            Path to exported CSV file, or None if error or no posts
         """
+        if not posts:
+            return None
+        
+        filepath = self.export_dir / self._get_export_filename(scheduler, 'csv', stamp)
+        
         try:
-            # Generate filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{scheduler}_posts_{timestamp}.csv"
-            filepath = self.export_dir / filename
-            
-            # Define CSV fields based on scheduler
-            if scheduler == 'buffer':
-                fields = self._get_buffer_fields()
-            elif scheduler == 'publer':
-                fields = self._get_publer_fields()
-            elif scheduler == 'later':
-                fields = self._get_later_fields()
-            elif scheduler == 'meta':
-                fields = self._get_meta_fields()
-            else:
-                fields = self._get_generic_fields()
+            self._ensure_export_dir()
             
-            # Write CSV
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fields)
-                writer.writeheader()
-                
-                for post in posts:
-                    row = self._format_post_for_scheduler(post, scheduler, fields)
-                    writer.writerow(row)
+            # Stream rows straight into the file through a large write buffer
+            with open(filepath, 'w', newline='', encoding='utf-8',
+                      buffering=EXPORT_WRITE_BUFFER_SIZE) as csvfile:
+                self._write_csv(csvfile, posts, scheduler)
             
             logger.info(f"CSV exported to {filepath}")
             return filepath
             
         except Exception as e:
             logger.error(f"Error exporting to CSV: {e}")
+            # Don't leave a half-written export behind
+            filepath.unlink(missing_ok=True)
             return None
     
-    def export_to_json(self, posts: List[Dict], scheduler: str = 'generic') -> Path | None:
+    def export_to_json(self, posts: List[Dict], scheduler: str = 'generic',
+                       stamp: Optional[str] = None,
+                       exported_at: Optional[datetime] = None) -> Path | None:
         """
         Export posts to JSON format
         
         Args:
             posts: List of post metadata dictionaries
             scheduler: Target scheduler
+            stamp: Filename stamp shared with the rest of the batch (None = new stamp)
+            exported_at: Export time recorded in the file (None = now)
             
         Returns:
-            Path to exported JSON file or None if error
+            Path to exported JSON file, or None if error or no posts
         """
+        if not posts:
+            return None
+        
+        filepath = self.export_dir / self._get_export_filename(scheduler, 'json', stamp)
+        
         try:
-            # Generate filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{scheduler}_posts_{timestamp}.json"
-            filepath = self.export_dir / filename
-            
-            # Format posts for JSON
-            formatted_posts = []
-            for post in posts:
-                formatted_post = self._format_post_for_json(post, scheduler)
-                formatted_posts.append(formatted_post)
-            
-            # Create export data
-            export_data = {
-                'scheduler': scheduler,
-                'exported_at': datetime.now().isoformat(),
-                'total_posts': len(formatted_posts),
-                'posts': formatted_posts
-            }
+            self._ensure_export_dir()
             
-            # Write JSON
-            with open(filepath, 'w', encoding='utf-8') as jsonfile:
-                json.dump(export_data, jsonfile, indent=2, ensure_ascii=False)
+            # Stream posts straight into the file through a large write buffer
+            with open(filepath, 'wb', buffering=EXPORT_WRITE_BUFFER_SIZE) as jsonfile:
+                self._write_json(jsonfile, posts, scheduler, exported_at)
             
             logger.info(f"JSON exported to {filepath}")
             return filepath
+        
+        except Exception as e:
+            logger.error(f"Error exporting to JSON: {e}")
+            # Don't leave a half-written export behind
+            filepath.unlink(missing_ok=True)
+            return None
+    
+    def _get_export_stamp(self, exported_at: Optional[datetime] = None) -> str:
+        """Get a unique timestamp-and-counter stamp for an export batch's filenames"""
+        exported_at = exported_at or datetime.now()
+        return f"{exported_at.strftime('%Y%m%d_%H%M%S')}_{next(self._export_counter)}"
+    
+    def _get_export_filename(self, scheduler: str, extension: str,
+                             stamp: Optional[str] = None) -> str:
+        """Get a timestamped export filename"""
+        return f"{scheduler}_posts_{stamp or self._get_export_stamp()}.{extension}"
+    
+    def _get_instructions_filename(self, scheduler: str, stamp: Optional[str] = None) -> str:
+        """Get a timestamped upload instructions filename"""
+        return f"{scheduler}_INSTRUCTIONS_{stamp or self._get_export_stamp()}.txt"
+    
+    def _write_csv(self, csvfile, posts: List[Dict], scheduler: str):
+        """Write posts as CSV for a scheduler to an open text file"""
+        # Resolve the scheduler's columns and row builder once, outside the row loop
+        fields, build_row = self._get_csv_layout(scheduler)
+        
+        # Rows go out as plain tuples in column order, consumed by one writerows call
+        writer = csv.writer(csvfile)
+        writer.writerow(fields)
+        writer.writerows(build_row(post) for post in posts)
+    
+    def _render_csv(self, posts: List[Dict], scheduler: str) -> str | None:
+        """Serialize posts to CSV text for a scheduler"""
+        try:
+            buffer = io.StringIO(newline='')
+            self._write_csv(buffer, posts, scheduler)
+            return buffer.getvalue()
+        
+        except Exception as e:
+            logger.error(f"Error exporting to CSV: {e}")
+            return None
+    
+    def _get_json_encoder(self, pretty: bool) -> Callable[[Any], bytes]:
+        """Get the UTF-8 JSON encoder for pretty (2-space indent) or compact output"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return lambda obj: orjson.dumps(obj, option=option)
+        
+        if pretty:
+            return lambda obj: json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+        return lambda obj: json.dumps(obj, separators=(',', ':'),
+                                      ensure_ascii=False).encode('utf-8')
+    
+    def _write_json(self, jsonfile, posts: List[Dict], scheduler: str,
+                    exported_at: Optional[datetime] = None):
+        """Write posts as JSON for a scheduler to an open binary file, one post at a time"""
+        # export.json_pretty: False writes compact JSON, which also keeps the
+        # stdlib fallback on its C encoder (indent forces the Python one)
+        pretty = self.config.get('export.json_pretty', True)
+        encode = self._get_json_encoder(pretty)
+        
+        # Encode the outer object with an empty post list and split it at the brackets,
+        # so posts are encoded one by one instead of as one document held in memory
+        shell = encode({
+            'scheduler': scheduler,
+            'exported_at': (exported_at or datetime.now()).isoformat(),
+            'total_posts': len(posts),
+            'posts': []
+        })
+        split = shell.rindex(b'[]') + 1
+        jsonfile.write(shell[:split])
+        
+        if posts:
+            # Pretty output nests posts two levels deep, so every post line is re-indented
+            indent, closing = (b'\n    ', b'\n  ') if pretty else (b'', b'')
+            format_post = self._format_post_for_json
+            separator = indent
+            for post in posts:
+                encoded = encode(format_post(post, scheduler))
+                if pretty:
+                    encoded = encoded.replace(b'\n', indent)
+                jsonfile.write(separator)
+                jsonfile.write(encoded)
+                separator = b',' + indent
+            jsonfile.write(closing)
+        
+        jsonfile.write(shell[split:])
+    
+    def _render_json(self, posts: List[Dict], scheduler: str,
+                     exported_at: Optional[datetime] = None) -> bytes | None:
+        """Serialize posts to UTF-8 JSON for a scheduler"""
+        try:
+            buffer = io.BytesIO()
+            self._write_json(buffer, posts, scheduler, exported_at)
+            return buffer.getvalue()
             
         except Exception as e:
             logger.error(f"Error exporting to JSON: {e}")
@@ -200,62 +334,78 @@ class ExportManager:
             'original_filename'
         ]
     
-    def _format_post_for_scheduler(self, post: Dict, scheduler: str, 
-                                   fields: List[str]) -> Dict:
-        """Format a post for specific scheduler CSV"""
-        row = {}
-        
+    def _get_csv_layout(self, scheduler: str) -> Tuple[List[str], Callable[[Dict], tuple]]:
+        """Get a scheduler's CSV fields and the function that builds one row for a post"""
         if scheduler == 'buffer':
-            row['text'] = post.get('full_text', '')
-            row['media_path'] = post.get('media_file', '')
-            row['profile'] = post.get('platform', '')
-            row['scheduled_at'] = f"{post.get('suggested_date', '')} {post.get('suggested_time', '')}"
-            row['status'] = 'scheduled'
-            
-        elif scheduler == 'publer':
-            row['platform'] = post.get('platform', '')
-            row['caption'] = post.get('caption', '')
-            row['media_url'] = post.get('media_file', '')
-            row['scheduled_date'] = post.get('suggested_date', '')
-            row['scheduled_time'] = post.get('suggested_time', '')
-            row['hashtags'] = post.get('hashtags_formatted', '')
-            
-        elif scheduler == 'later':
-            row['caption'] = post.get('full_text', '')
-            row['media_path'] = post.get('media_file', '')
-            row['platform'] = post.get('platform', '')
-            row['schedule_date'] = post.get('suggested_date', '')
-            row['schedule_time'] = post.get('suggested_time', '')
-            
-        elif scheduler == 'meta':
-            row['message'] = post.get('caption', '')
-            row['media_path'] = post.get('media_file', '')
-            row['platform'] = post.get('platform', '')
-            # Convert to ISO format for Meta
-            date_str = post.get('suggested_date', '')
-            time_str = post.get('suggested_time', '')
-            if date_str and time_str:
-                row['scheduled_publish_time'] = f"{date_str}T{time_str}:00"
-            else:
-                row['scheduled_publish_time'] = ''
-            row['page_id'] = ''  # User must fill this in
-            
-        else:  # generic
-            for field in fields:
-                row[field] = post.get(field, '')
+            return self._get_buffer_fields(), self._build_buffer_row
+        if scheduler == 'publer':
+            return self._get_publer_fields(), self._build_publer_row
+        if scheduler == 'later':
+            return self._get_later_fields(), self._build_later_row
+        if scheduler == 'meta':
+            return self._get_meta_fields(), self._build_meta_row
         
-        return row
+        # Generic rows copy the matching post fields
+        fields = self._get_generic_fields()
+        return fields, lambda post: tuple([post.get(field, '') for field in fields])
+    
+    @staticmethod
+    def _build_buffer_row(post: Dict) -> tuple:
+        """Build a Buffer CSV row (text, media_path, profile, scheduled_at, status)"""
+        get = post.get
+        return (
+            get('full_text', ''),
+            get('media_file', ''),
+            get('platform', ''),
+            f"{get('suggested_date', '')} {get('suggested_time', '')}",
+            'scheduled'
+        )
+    
+    @staticmethod
+    def _build_publer_row(post: Dict) -> tuple:
+        """Build a Publer CSV row (platform, caption, media_url, scheduled_date, scheduled_time, hashtags)"""
+        get = post.get
+        return (
+            get('platform', ''),
+            get('caption', ''),
+            get('media_file', ''),
+            get('suggested_date', ''),
+            get('suggested_time', ''),
+            get('hashtags_formatted', '')
+        )
+    
+    @staticmethod
+    def _build_later_row(post: Dict) -> tuple:
+        """Build a Later CSV row (caption, media_path, platform, schedule_date, schedule_time)"""
+        get = post.get
+        return (
+            get('full_text', ''),
+            get('media_file', ''),
+            get('platform', ''),
+            get('suggested_date', ''),
+            get('suggested_time', '')
+        )
+    
+    @staticmethod
+    def _build_meta_row(post: Dict) -> tuple:
+        """Build a Meta CSV row (message, media_path, platform, scheduled_publish_time, page_id)"""
+        get = post.get
+        # Convert to ISO format for Meta
+        date_str = get('suggested_date', '')
+        time_str = get('suggested_time', '')
+        return (
+            get('caption', ''),
+            get('media_file', ''),
+            get('platform', ''),
+            f"{date_str}T{time_str}:00" if date_str and time_str else '',
+            ''  # page_id - user must fill this in
+        )
     
     def _format_post_for_json(self, post: Dict, scheduler: str) -> Dict:
         """Format a post for JSON export"""
-        # JSON export includes all post data
-        formatted = post.copy()
-        
-        # Add scheduler-specific formatting
-        formatted['scheduler'] = scheduler
-        formatted['ready_to_upload'] = True
-        
-        return formatted
+        # JSON export includes all post data plus scheduler-specific fields,
+        # built in one dict display rather than copy-then-assign
+        return {**post, 'scheduler': scheduler, 'ready_to_upload': True}
     
     def create_upload_instructions(self, scheduler: str, exported_files: Dict[str, Path]) -> str:
         """
@@ -268,31 +418,27 @@ class ExportManager:
         Returns:
             Instructions text
         """
-        instructions = f"\n{'='*60}\n"
-        instructions += f"UPLOAD INSTRUCTIONS FOR {scheduler.upper()}\n"
-        instructions += f"{'='*60}\n\n"
+        rule = '=' * 60
+        parts = [
+            f"\n{rule}\n",
+            f"UPLOAD INSTRUCTIONS FOR {scheduler.upper()}\n",
+            f"{rule}\n\n",
+            "Exported Files:\n"
+        ]
         
         # List exported files
-        instructions += "Exported Files:\n"
-        for file_type, filepath in exported_files.items():
-            instructions += f"  - {file_type.upper()}: {filepath}\n"
-        instructions += "\n"
+        parts.extend(f"  - {file_type.upper()}: {filepath}\n"
+                     for file_type, filepath in exported_files.items())
+        parts.append("\n")
         
         # Scheduler-specific instructions
-        if scheduler == 'buffer':
-            instructions += self._get_buffer_instructions()
-        elif scheduler == 'publer':
-            instructions += self._get_publer_instructions()
-        elif scheduler == 'later':
-            instructions += self._get_later_instructions()
-        elif scheduler == 'meta':
-            instructions += self._get_meta_instructions()
-        else:
-            instructions += self._get_generic_instructions()
+        get_instructions = self._SCHEDULER_INSTRUCTIONS.get(scheduler,
+                                                            ExportManager._get_generic_instructions)
+        parts.append(get_instructions(self))
         
-        instructions += f"\n{'='*60}\n"
+        parts.append(f"\n{rule}\n")
         
-        return instructions
+        return ''.join(parts)
     
     def _get_buffer_instructions(self) -> str:
         """Get upload instructions for Buffer"""
@@ -383,13 +529,23 @@ Note: Each scheduler has different import capabilities.
 Refer to your scheduler's documentation for specific import instructions.
 """
     
-    def save_instructions(self, scheduler: str, exported_files: Dict[str, Path]) -> Path | None:
+    # Upload instruction builders by scheduler (anything else gets the generic ones)
+    _SCHEDULER_INSTRUCTIONS = {
+        'buffer': _get_buffer_instructions,
+        'publer': _get_publer_instructions,
+        'later': _get_later_instructions,
+        'meta': _get_meta_instructions
+    }
+    
+    def save_instructions(self, scheduler: str, exported_files: Dict[str, Path],
+                          stamp: Optional[str] = None) -> Path | None:
         """
         Save upload instructions to a text file
         
         Args:
             scheduler: Target scheduler name
             exported_files: Dictionary of exported file paths
+            stamp: Filename stamp of the export batch (None = new stamp)
             
         Returns:
             Path to instructions file or None if error
@@ -397,9 +553,8 @@ Refer to your scheduler's documentation for specific import instructions.
         try:
             instructions = self.create_upload_instructions(scheduler, exported_files)
             
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{scheduler}_INSTRUCTIONS_{timestamp}.txt"
-            filepath = self.export_dir / filename
+            self._ensure_export_dir()
+            filepath = self.export_dir / self._get_instructions_filename(scheduler, stamp)
             
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(instructions)